@@ -0,0 +1,76 @@
+# benchmarks/bench_ann.py
+"""
+Benchmark the IVF int8 index against exact search.
+
+Reports recall@10 (vs. brute-force float32), queries per second and vector
+memory for a sweep of nprobe values. Run from the backend directory:
+
+    python -m benchmarks.bench_ann --size 200000 --nlist 512
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.vector_index import ExactIndex, IVFIndex
+
+
+def make_corpus(size: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered unit vectors, roughly how topical text embeddings behave"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size)
+    data = centers[labels] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def timed_search(index, queries: np.ndarray, k: int, **params):
+    started = time.perf_counter()
+    results = [[chunk_id for chunk_id, _ in index.search(q, k, **params)] for q in queries]
+    return results, len(queries) / (time.perf_counter() - started)
+
+
+def recall_at_k(truth, found) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / sum(len(t) for t in truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = make_corpus(args.size, args.dim, clusters=max(args.nlist // 2, 1), rng=rng)
+    ids = np.arange(args.size, dtype=np.int64)
+    queries = data[rng.choice(args.size, args.queries, replace=False)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact = ExactIndex(args.dim)
+    exact.add(ids, data)
+    truth, exact_qps = timed_search(exact, queries, args.k)
+
+    started = time.perf_counter()
+    ivf = IVFIndex(args.dim, nlist=args.nlist, train_size=args.size)
+    ivf.add(ids, data)
+    build_seconds = time.perf_counter() - started
+
+    print(f"corpus: {args.size} x {args.dim}, queries: {args.queries}, k={args.k}")
+    print(f"exact  memory: {exact.memory_bytes() / 2**20:8.1f} MiB   qps: {exact_qps:8.1f}")
+    print(f"ivf    memory: {ivf.memory_bytes() / 2**20:8.1f} MiB   build: {build_seconds:.1f}s (nlist={args.nlist})")
+    print()
+    print(f"{'nprobe':>6}  {'recall@' + str(args.k):>9}  {'qps':>9}  {'speedup':>7}")
+    for nprobe in args.nprobe:
+        found, qps = timed_search(ivf, queries, args.k, nprobe=nprobe)
+        print(f"{nprobe:>6}  {recall_at_k(truth, found):>9.3f}  {qps:>9.1f}  {qps / exact_qps:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_dedup.py
+"""
+Report index-size reduction and ingest throughput of near-duplicate detection.
+
+Builds a corpus where every base document also exists in several edited
+versions (a few words changed, a paragraph inserted near the end, like
+drafts and v2/v3), ingests it through RetrievalService with and without
+MinHash/LSH deduplication, and compares indexed vectors, index and
+dedup memory, ingest throughput and how many top-k sources are redundant
+copies. Run from the backend directory:
+
+    python -m benchmarks.bench_dedup --documents 100 --versions 4
+    python -m benchmarks.bench_dedup --index ivf --nlist 16
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+from models.schemas import DocumentInfo
+from services.retrieval_service import RetrievalService
+from services.vector_index import ExactIndex, IVFIndex
+
+
+def make_versions(rng: np.random.Generator, vocabulary: np.ndarray, words: int, versions: int, edits: int):
+    """A base text plus `versions - 1` lightly edited copies"""
+    base = list(rng.choice(vocabulary, words))
+    texts = [" ".join(base)]
+    for _ in range(versions - 1):
+        edited = list(base)
+        for position in rng.choice(words, edits, replace=False):
+            edited[position] = str(rng.choice(vocabulary))
+        insert_at = int(words * 0.9)
+        edited[insert_at:insert_at] = list(rng.choice(vocabulary, 40))
+        texts.append(" ".join(edited))
+    return texts
+
+
+def ingest(texts, directory: Path, deduplicate: bool, kind: str, nlist: int):
+    if kind == "ivf":
+        index = IVFIndex(settings.EMBEDDING_DIM, nlist=nlist)
+    else:
+        index = ExactIndex(settings.EMBEDDING_DIM)
+    service = RetrievalService(index=index, deduplicate=deduplicate)
+    started = time.perf_counter()
+    for number, text in enumerate(texts):
+        path = directory / f"{number}.txt"
+        info = DocumentInfo(
+            id=str(number),
+            filename=path.name,
+            size=len(text),
+            upload_time=datetime.now(),
+            status="processed",
+            type="txt"
+        )
+        service.add_document(info, text, path)
+    return service, time.perf_counter() - started
+
+
+def redundant_share(service: RetrievalService, queries, k: int, versions: int) -> float:
+    """Fraction of returned sources that repeat a chunk already returned"""
+    redundant = total = 0
+    for query in queries:
+        seen = set()
+        for source in service.search(query, top_k=k):
+            # Same chunk position within the same base document family
+            key = (int(source["id"]) // versions, source["chunk"])
+            redundant += key in seen
+            seen.add(key)
+            total += 1
+    return redundant / max(total, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100, help="Distinct base documents")
+    parser.add_argument("--versions", type=int, default=4, help="Versions per document (1 = no duplicates)")
+    parser.add_argument("--words", type=int, default=1500)
+    parser.add_argument("--edits", type=int, default=5, help="Words changed per version")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index", choices=("exact", "ivf"), default="exact")
+    parser.add_argument("--nlist", type=int, default=16, help="IVF lists; trains after nlist * 39 vectors")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vocabulary = np.array([f"term{i}" for i in range(20000)])
+    texts = []
+    for _ in range(args.documents):
+        texts.extend(make_versions(rng, vocabulary, args.words, args.versions, args.edits))
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    queries = []
+    for number in rng.choice(len(texts), args.queries):
+        tokens = texts[number].split()
+        start = int(rng.integers(0, len(tokens) - 12))
+        queries.append(" ".join(tokens[start:start + 12]))
+
+    print(f"corpus: {args.documents} documents x {args.versions} versions = {len(texts)} files, {megabytes:.1f} MiB")
+    print(f"index: {args.index}")
+    print(f"{'dedup':>6}  {'chunks':>7}  {'indexed':>7}  {'index KiB':>9}  {'dedup KiB':>9}  "
+          f"{'docs/s':>7}  {'MiB/s':>6}  {'redundant@' + str(args.k):>12}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for number, text in enumerate(texts):
+            (directory / f"{number}.txt").write_text(text, encoding="utf-8")
+
+        for deduplicate in (False, True):
+            service, seconds = ingest(texts, directory, deduplicate, args.index, args.nlist)
+            stats = service.stats()
+            results[deduplicate] = stats["index_bytes"] + stats["dedup_bytes"]
+            print(f"{'on' if deduplicate else 'off':>6}  {len(service.chunks):>7}  {len(service.index):>7}  "
+                  f"{stats['index_bytes'] / 1024:>9.0f}  {stats['dedup_bytes'] / 1024:>9.0f}  "
+                  f"{len(texts) / seconds:>7.1f}  {megabytes / seconds:>6.2f}  "
+                  f"{redundant_share(service, queries, args.k, args.versions):>12.1%}")
+            service.close()
+
+    # Negative when the signatures outweigh the vectors they save (small IVF codes)
+    print(f"\nmemory change with dedup (index + dedup): {results[True] / results[False] - 1:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
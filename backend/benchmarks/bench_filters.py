@@ -0,0 +1,110 @@
+# benchmarks/bench_filters.py
+"""
+Benchmark metadata filter evaluation and filtered retrieval.
+
+Times MetadataIndex filter evaluation (per thousand documents) for type,
+upload-date and id-list criteria, then compares recall@k of pre-filtering
+inside the IVF scoring loop against post-filtering an unfiltered top-k.
+Run from the backend directory:
+
+    python -m benchmarks.bench_filters --documents 10000 --chunks-per-doc 10
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.bench_ann import make_corpus, recall_at_k
+from models.schemas import DocumentFilter, DocumentInfo
+from services.metadata_index import MetadataIndex
+from services.vector_index import ExactIndex, IVFIndex
+
+TYPES = ["pdf", "docx", "txt", "md"]
+
+
+def per_call_us(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--chunks-per-doc", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    size = args.documents * args.chunks_per_doc
+    epoch = datetime(2024, 1, 1)
+
+    metadata = MetadataIndex()
+    doc_ids = [f"doc-{i}" for i in range(args.documents)]
+    for i, doc_id in enumerate(doc_ids):
+        info = DocumentInfo(
+            id=doc_id,
+            filename=f"{doc_id}.{TYPES[i % len(TYPES)]}",
+            size=0,
+            upload_time=epoch + timedelta(hours=i),
+            status="processed",
+            type=TYPES[i % len(TYPES)]
+        )
+        chunk_ids = np.arange(i * args.chunks_per_doc, (i + 1) * args.chunks_per_doc, dtype=np.int64)
+        metadata.add(info, chunk_ids)
+
+    selection = list(rng.choice(doc_ids, max(args.documents // 100, 1), replace=False))
+    filters = {
+        "type": DocumentFilter(types=["pdf"]),
+        "date range": DocumentFilter(
+            uploaded_after=epoch + timedelta(hours=args.documents // 4),
+            uploaded_before=epoch + timedelta(hours=args.documents // 2)
+        ),
+        "id list (1%)": DocumentFilter(document_ids=selection),
+        "type + date": DocumentFilter(types=["pdf", "md"], uploaded_after=epoch + timedelta(hours=args.documents // 2))
+    }
+
+    thousands = args.documents / 1000
+    print(f"documents: {args.documents}, chunks: {size}")
+    print(f"{'filter':>14}  {'selected':>8}  {'us/call':>8}  {'us/1k docs':>10}")
+    for name, criteria in filters.items():
+        call_us = per_call_us(lambda: metadata.document_mask(criteria), args.repeat)
+        selected = int(metadata.document_mask(criteria).sum())
+        print(f"{name:>14}  {selected:>8}  {call_us:>8.1f}  {call_us / thousands:>10.2f}")
+
+    # Filtered retrieval: pre-filter mask vs. post-filtering an unfiltered top-k
+    data = make_corpus(size, args.dim, clusters=max(args.nlist // 2, 1), rng=rng)
+    ids = np.arange(size, dtype=np.int64)
+    queries = data[rng.choice(size, args.queries, replace=False)]
+
+    exact = ExactIndex(args.dim)
+    exact.add(ids, data)
+    ivf = IVFIndex(args.dim, nlist=args.nlist, train_size=size)
+    ivf.add(ids, data)
+
+    print()
+    print(f"{'filter':>14}  {'pre recall':>10}  {'post recall':>11}  {'pre qps':>8}")
+    for name, criteria in filters.items():
+        mask = metadata.chunk_mask(criteria)
+        truth = [[i for i, _ in exact.search(q, args.k, mask=mask)] for q in queries]
+
+        started = time.perf_counter()
+        pre = [[i for i, _ in ivf.search(q, args.k, nprobe=args.nprobe, mask=mask)] for q in queries]
+        pre_qps = len(queries) / (time.perf_counter() - started)
+        post = [
+            [i for i, _ in ivf.search(q, args.k, nprobe=args.nprobe) if mask[i]]
+            for q in queries
+        ]
+        print(f"{name:>14}  {recall_at_k(truth, pre):>10.3f}  {recall_at_k(truth, post):>11.3f}  {pre_qps:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_generation.py
+"""
+Benchmark HTTPGenerator throughput and tail latency against the stand-in server.
+
+Starts benchmarks/standin_llm_server.py in a subprocess, fires concurrent
+generations through one pooled client, and optionally repeats the run with
+a fresh client per call for comparison. Run from the backend directory:
+
+    python -m benchmarks.bench_generation --requests 500 --concurrency 64 --unpooled
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from services.http_generator import HTTPGenerator
+
+SOURCES = [{"filename": "sample_document.pdf", "snippet": "retrieval augmented generation"}]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(base_url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Stand-in server did not start")
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+async def run(args, base_url: str, pooled: bool):
+    options = dict(
+        base_url=base_url,
+        model="stand-in",
+        max_tokens=args.max_tokens,
+        max_concurrency=args.concurrency,
+        max_connections=args.concurrency,
+        http2=args.http2
+    )
+    shared = HTTPGenerator(**options) if pooled else None
+    latencies, errors = [], 0
+    limiter = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with limiter:
+            generator = shared or HTTPGenerator(**options)
+            started = time.perf_counter()
+            try:
+                await generator.generate(f"question {i}", SOURCES)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+            finally:
+                if not pooled:
+                    await generator.aclose()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    stats = shared.stats() if shared else {}
+    if shared:
+        await shared.aclose()
+
+    label = "pooled" if pooled else "per-call"
+    print(f"\n--- {label} client ---")
+    print(f"requests: {len(latencies)} ok, {errors} failed in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.1f} req/s, "
+          f"{len(latencies) * args.max_tokens / elapsed:.0f} tokens/s")
+    if latencies:
+        print(f"latency ms: p50 {percentile(latencies, 50) * 1000:.0f}  "
+              f"p95 {percentile(latencies, 95) * 1000:.0f}  "
+              f"p99 {percentile(latencies, 99) * 1000:.0f}  "
+              f"mean {statistics.mean(latencies) * 1000:.0f}")
+    if stats:
+        print(f"retries: {stats['retries']}, failures: {stats['failures']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=32)
+    parser.add_argument("--ttft-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--http2", action="store_true")
+    parser.add_argument("--unpooled", action="store_true", help="Also run with a new client per call")
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.standin_llm_server",
+        "--port", str(port),
+        "--ttft-ms", str(args.ttft_ms),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--completion-tokens", str(args.max_tokens),
+        "--error-rate", str(args.error_rate)
+    ])
+    try:
+        asyncio.run(wait_until_up(base_url))
+        print(f"stand-in: ttft {args.ttft_ms:.0f} ms, {args.tokens_per_second:.0f} tokens/s, "
+              f"error rate {args.error_rate:.0%}; {args.requests} requests at concurrency {args.concurrency}")
+        asyncio.run(run(args, base_url, pooled=True))
+        if args.unpooled:
+            asyncio.run(run(args, base_url, pooled=False))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
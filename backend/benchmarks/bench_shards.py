@@ -0,0 +1,66 @@
+# benchmarks/bench_shards.py
+"""
+Benchmark scatter-gather retrieval QPS as the shard count grows.
+
+Builds the same corpus into a ShardedIndex for each shard count, checks the
+results match single-process exact search, then measures queries per second.
+Scaling is bounded by physical cores and memory bandwidth. Run from the
+backend directory:
+
+    python -m benchmarks.bench_shards --size 400000 --shards 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_ann import make_corpus
+from services.sharded_index import ShardedIndex
+from services.vector_index import ExactIndex
+
+
+def measure_qps(index, queries: np.ndarray, k: int):
+    started = time.perf_counter()
+    results = [index.search(q, k) for q in queries]
+    return results, len(queries) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = make_corpus(args.size, args.dim, clusters=128, rng=rng)
+    ids = np.arange(args.size, dtype=np.int64)
+    queries = data[rng.choice(args.size, args.queries, replace=False)]
+
+    exact = ExactIndex(args.dim)
+    exact.add(ids, data)
+    truth, baseline_qps = measure_qps(exact, queries, args.k)
+
+    print(f"corpus: {args.size} x {args.dim}, queries: {args.queries}, cpus: {os.cpu_count()}")
+    print(f"{'shards':>6}  {'qps':>9}  {'speedup':>7}  {'matches':>7}")
+    print(f"{'exact':>6}  {baseline_qps:>9.1f}  {1.0:>6.1f}x  {'-':>7}")
+    for shards in args.shards:
+        index = ShardedIndex(args.dim, shards=shards, initial_capacity=args.size // shards + 1)
+        try:
+            index.add(ids, data)
+            index.search(queries[0], args.k)  # warm up the workers
+            found, qps = measure_qps(index, queries, args.k)
+            matches = all(
+                [i for i, _ in f] == [i for i, _ in t] for f, t in zip(found, truth)
+            )
+            print(f"{shards:>6}  {qps:>9.1f}  {qps / baseline_qps:>6.1f}x  {str(matches):>7}")
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/standin_llm_server.py
+"""
+Local stand-in for an OpenAI-compatible model server.
+
+Serves POST /v1/chat/completions with simulated time-to-first-token,
+tokens/sec and error rate, so generation throughput and tail latency can
+be measured offline. Point the backend at it with GENERATOR=http and
+LLM_BASE_URL=http://localhost:8001. Run from the backend directory:
+
+    python -m benchmarks.standin_llm_server --port 8001 --ttft-ms 200 --tokens-per-second 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+VOCABULARY = (
+    "the document describes how the system retrieves relevant passages "
+    "and generates an answer with citations from uploaded sources"
+).split()
+
+
+def create_app(
+    ttft_ms: float = 200.0,
+    tokens_per_second: float = 50.0,
+    completion_tokens: int = 64,
+    error_rate: float = 0.0,
+    jitter: float = 0.1
+) -> FastAPI:
+    app = FastAPI(title="Stand-in LLM server")
+
+    def _vary(seconds: float) -> float:
+        return max(seconds * (1 + random.uniform(-jitter, jitter)), 0.0)
+
+    def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        if random.random() < error_rate:
+            return JSONResponse({"error": "simulated overload"}, status_code=503)
+
+        model = payload.get("model", "stand-in")
+        count = min(payload.get("max_tokens") or completion_tokens, completion_tokens)
+        tokens = [random.choice(VOCABULARY) + " " for _ in range(count)]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        if not payload.get("stream"):
+            await asyncio.sleep(_vary(ttft_ms / 1000 + count / tokens_per_second))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}],
+                "usage": {"completion_tokens": count}
+            }
+
+        async def events():
+            await asyncio.sleep(_vary(ttft_ms / 1000))
+            yield _chunk(completion_id, model, {"role": "assistant"})
+            for token in tokens:
+                yield _chunk(completion_id, model, {"content": token})
+                await asyncio.sleep(_vary(1 / tokens_per_second))
+            yield _chunk(completion_id, model, {}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--completion-tokens", type=int, default=64)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    app = create_app(args.ttft_ms, args.tokens_per_second, args.completion_tokens, args.error_rate, args.jitter)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 # config.py
+from pathlib import Path
 from pydantic_settings import BaseSettings
 from typing import List
-import os
+
+# Relative data paths below resolve against this directory, not the cwd
+BACKEND_DIR = Path(__file__).resolve().parent
 
 class Settings(BaseSettings):
     # App settings
@@ -25,11 +28,53 @@ class Settings(BaseSettings):
     # RAG settings
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    RETRIEVAL_TOP_K: int = 4
+    SNIPPET_CHARS: int = 300
+    EMBEDDING_DIM: int = 256
+    
+    # Near-duplicate chunks at ingest (MinHash + LSH): indexed once, referenced after
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8
+    MINHASH_PERMUTATIONS: int = 128
+    LSH_BANDS: int = 16
+    
+    # Vector index settings ("exact", "ivf" or "sharded")
+    VECTOR_INDEX: str = "exact"
+    IVF_NLIST: int = 256
+    IVF_NPROBE: int = 8
+    RETRIEVAL_SHARDS: int = 4
+    
+    # Generation settings ("demo" or "http" for an OpenAI-compatible server)
+    GENERATOR: str = "demo"
+    LLM_BASE_URL: str = "http://localhost:8001"
+    LLM_MODEL: str = "stand-in"
+    LLM_MAX_TOKENS: int = 256
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_CONNECTIONS: int = 32
+    LLM_HTTP2: bool = True
+    LLM_CONNECT_TIMEOUT: float = 2.0
+    LLM_READ_TIMEOUT: float = 30.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF: float = 0.25
+    
+    # Directory tree API: a DirectoryScanner JSON file or a directory to scan,
+    # relative to BACKEND_DIR. The backend image holds only backend/, so
+    # docker-compose mounts the scan and points this at it.
+    TREE_SOURCE: str = "../directory_structure.json"
+    # Most nodes one GET /api/v1/tree response may hold, across all levels
+    TREE_MAX_NODES: int = 10000
+    
+    # Startup: build services in the lifespan instead of on first request
+    WARM_UP_SERVICES: bool = True
+    
+    # On-demand request profiling (off: no middleware is installed at all)
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILING_MODE: str = "cprofile"  # or "sampling"
+    PROFILING_SAMPLE_INTERVAL: float = 0.005
+    PROFILING_BUFFER_SIZE: int = 20
     
     class Config:
         env_file = ".env"
 
-settings = Settings()
-
-# Ensure upload directory exists
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
\ No newline at end of file
+settings = Settings()
\ No newline at end of file
@@ -1,90 +0,0 @@
-# services/chat_service.py
-import asyncio
-import logging
-import uuid
-from datetime import datetime
-from typing import List, Dict, Any
-from models.schemas import ChatResponse, MessageRole
-
-logger = logging.getLogger(__name__)
-
-class ChatService:
-    def __init__(self):
-        self.conversations: Dict[str, List[Dict]] = {}
-        
-    async def process_message(self, message: str, conversation_id: str = None) -> ChatResponse:
-        """Process chat message and return response"""
-        
-        if not conversation_id:
-            conversation_id = str(uuid.uuid4())
-            
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-            
-        # Add user message to conversation
-        user_message = {
-            "id": str(uuid.uuid4()),
-            "content": message,
-            "role": MessageRole.USER,
-            "timestamp": datetime.now()
-        }
-        self.conversations[conversation_id].append(user_message)
-        
-        logger.info(f"💬 Processing message: {message[:50]}...")
-        
-        # Simulate processing time
-        await asyncio.sleep(1)
-        
-        # Generate response (this is where you'd integrate actual RAG)
-        response_content = await self._generate_response(message, conversation_id)
-        
-        response = ChatResponse(
-            id=str(uuid.uuid4()),
-            content=response_content,
-            role=MessageRole.ASSISTANT,
-            timestamp=datetime.now(),
-            conversation_id=conversation_id,
-            sources=[
-                {
-                    "id": "doc_1",
-                    "filename": "sample_document.pdf",
-                    "page": 1,
-                    "relevance_score": 0.85
-                }
-            ]
-        )
-        
-        # Add to conversation history
-        self.conversations[conversation_id].append(response.dict())
-        
-        return response
-    
-    async def _generate_response(self, message: str, conversation_id: str) -> str:
-        """Generate AI response - integrate your RAG logic here"""
-        
-        # Simple demo responses
-        if "hello" in message.lower():
-            return "Hello! I'm your RAG assistant. I can help you with questions about your uploaded documents. What would you like to know?"
-            
-        elif "document" in message.lower():
-            return "I can see you have several documents uploaded. Based on the content, I can help answer questions about them. Please be more specific about what you'd like to know."
-            
-        elif "?" in message:
-            return f"That's an interesting question about '{message}'. Based on the documents you've uploaded, here's what I can tell you:\n\n• This is a demo response\n• In a real system, I would search through your documents\n• And provide relevant answers with source citations\n\nWould you like me to search for something more specific?"
-            
-        else:
-            return f"I understand you're asking about: '{message}'. While this is a demo response, a full RAG system would:\n\n1. 🔍 Search through your uploaded documents\n2. 📄 Find relevant passages\n3. 🤖 Generate an informed response\n4. 📚 Provide source citations\n\nPlease upload some documents and ask specific questions to see the full functionality!"
-    
-    async def get_conversation_history(self, conversation_id: str) -> List[Dict]:
-        """Get conversation history"""
-        return self.conversations.get(conversation_id, [])
-    
-    async def clear_conversation(self, conversation_id: str) -> bool:
-        """Clear conversation history"""
-        if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
-            return True
-        return False
-
-# Global instance
-chat_service = ChatService()
\ No newline at end of file
@@ -1,5 +1,5 @@
 # models/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -9,9 +9,26 @@ class MessageRole(str, Enum):
     ASSISTANT = "assistant"
     SYSTEM = "system"
 
+def normalise_type(kind: str) -> str:
+    """File types are matched case-insensitively, with or without the dot"""
+    return kind.lower().lstrip(".")
+
+class DocumentFilter(BaseModel):
+    """Restrict retrieval to matching documents; criteria are ANDed"""
+    types: Optional[List[str]] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+    document_ids: Optional[List[str]] = None
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.model_dump().values())
+
 class ChatMessage(BaseModel):
     message: str
     conversation_id: Optional[str] = None
+    # ANN recall/latency knob: inverted lists probed per query (IVF index only)
+    nprobe: Optional[int] = Field(None, ge=1)
+    filters: Optional[DocumentFilter] = None
 
 class ChatResponse(BaseModel):
     id: str
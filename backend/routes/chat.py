@@ -1,22 +1,28 @@
 # routes/chat.py
 from fastapi import APIRouter, HTTPException, Depends
 from models.schemas import ChatMessage, ChatResponse, ErrorResponse
-from services.chat_service import chat_service
+from services.chat_service import ChatService
+from services.providers import get_chat_service
 from utils.logger import get_logger
 from datetime import datetime
 
 router = APIRouter()
 logger = get_logger(__name__)
 
-@router.post("/", response_model=ChatResponse)
-async def send_message(message_data: ChatMessage):
+@router.post("", response_model=ChatResponse)
+async def send_message(
+    message_data: ChatMessage,
+    chat_service: ChatService = Depends(get_chat_service)
+):
     """Send a chat message and get AI response"""
     try:
         logger.info(f"💬 New chat message: {message_data.message[:50]}...")
         
         response = await chat_service.process_message(
             message_data.message, 
-            message_data.conversation_id
+            message_data.conversation_id,
+            nprobe=message_data.nprobe,
+            filters=message_data.filters
         )
         
         logger.info(f"✅ Response generated for conversation: {response.conversation_id}")
@@ -27,7 +33,7 @@ async def send_message(message_data: ChatMessage):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/history/{conversation_id}")
-async def get_chat_history(conversation_id: str):
+async def get_chat_history(conversation_id: str, chat_service: ChatService = Depends(get_chat_service)):
     """Get chat history for a conversation"""
     try:
         history = await chat_service.get_conversation_history(conversation_id)
@@ -36,8 +42,13 @@ async def get_chat_history(conversation_id: str):
         logger.error(f"❌ History error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stats")
+def get_chat_stats(chat_service: ChatService = Depends(get_chat_service)):
+    """Get request coalescing and retrieval index statistics"""
+    return chat_service.get_stats()
+
 @router.delete("/history/{conversation_id}")
-async def clear_chat_history(conversation_id: str):
+async def clear_chat_history(conversation_id: str, chat_service: ChatService = Depends(get_chat_service)):
     """Clear chat history"""
     try:
         success = await chat_service.clear_conversation(conversation_id)
@@ -0,0 +1,56 @@
+# routes/debug.py
+from fastapi import APIRouter, HTTPException, Header, Query, Request
+from fastapi.responses import PlainTextResponse, Response
+from typing import Optional
+import hmac
+from config import settings
+from utils.profiling import render_collapsed, render_text
+from utils.logger import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+def _check_token(token: Optional[str]):
+    # Header values arrive latin-1 decoded; compare the raw bytes
+    if not settings.PROFILING_TOKEN or not token or not hmac.compare_digest(
+        token.encode("latin-1"), settings.PROFILING_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+@router.get("/profiles")
+async def list_profiles(request: Request, x_profile_token: Optional[str] = Header(None)):
+    """List stored request profiles, newest first"""
+    _check_token(x_profile_token)
+    return {"profiles": request.app.state.profile_store.list()}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(pstats|text|collapsed)$"),
+    x_profile_token: Optional[str] = Header(None)
+):
+    """Download a profile as pstats, text or collapsed stacks"""
+    _check_token(x_profile_token)
+    profile = request.app.state.profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    # cProfile runs give pstats (or a text table); sampling runs give stacks
+    formats = ("pstats", "text") if "pstats" in profile else ("collapsed",)
+    format = format or formats[0]
+    if format not in formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{profile['profiler']} profiles are available as: {', '.join(formats)}"
+        )
+
+    if format == "pstats":
+        return Response(
+            content=profile["pstats"],
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'}
+        )
+    if format == "text":
+        return PlainTextResponse(render_text(profile))
+    return PlainTextResponse(render_collapsed(profile))
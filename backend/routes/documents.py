@@ -1,15 +1,21 @@
 # routes/documents.py
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header
+from typing import List, Optional
+import mimetypes
 from models.schemas import DocumentInfo, DocumentUploadResponse
-from services.document_service import document_service
+from services.document_service import DocumentService
+from services.providers import get_document_service
+from utils.file_response import RangeFileResponse
 from utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 @router.post("/upload", response_model=DocumentUploadResponse)
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(
+    file: UploadFile = File(...),
+    document_service: DocumentService = Depends(get_document_service)
+):
     """Upload a document"""
     try:
         logger.info(f"📤 Uploading: {file.filename}")
@@ -23,8 +29,8 @@ async def upload_document(file: UploadFile = File(...)):
         logger.error(f"❌ Upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[DocumentInfo])
-async def list_documents():
+@router.get("", response_model=List[DocumentInfo])
+async def list_documents(document_service: DocumentService = Depends(get_document_service)):
     """Get list of uploaded documents"""
     try:
         documents = await document_service.list_documents()
@@ -35,7 +41,7 @@ async def list_documents():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{document_id}", response_model=DocumentInfo)
-async def get_document(document_id: str):
+async def get_document(document_id: str, document_service: DocumentService = Depends(get_document_service)):
     """Get document details"""
     try:
         document = await document_service.get_document(document_id)
@@ -48,8 +54,28 @@ async def get_document(document_id: str):
         logger.error(f"❌ Get document error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{document_id}/content")
+async def get_document_content(
+    document_id: str,
+    range_header: Optional[str] = Header(None, alias="range"),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    """Serve the original file, with HTTP Range support"""
+    document = await document_service.get_document(document_id)
+    file_path = document_service.get_document_path(document_id)
+    if not document or not file_path.exists():
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    media_type, _ = mimetypes.guess_type(document.filename)
+    return RangeFileResponse(
+        str(file_path),
+        range_header=range_header,
+        media_type=media_type,
+        filename=document.filename
+    )
+
 @router.delete("/{document_id}")
-async def delete_document(document_id: str):
+async def delete_document(document_id: str, document_service: DocumentService = Depends(get_document_service)):
     """Delete a document"""
     try:
         success = await document_service.delete_document(document_id)
@@ -0,0 +1,53 @@
+# routes/tree.py
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import TYPE_CHECKING
+from config import settings
+from services.providers import get_tree_index
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    # Loads NumPy; the provider imports it when the tree is first used
+    from services.tree_index import TreeIndex
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+def tree_index() -> "TreeIndex":
+    """Tree index dependency; 503 while no scan source is available"""
+    try:
+        return get_tree_index()
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        logger.error(f"❌ Tree index unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="Directory tree is not available")
+
+@router.get("")
+async def get_tree(
+    path: str = ".",
+    depth: int = Query(1, ge=0, le=16),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    tree: "TreeIndex" = Depends(tree_index)
+):
+    """Expand one node of the directory tree, `depth` levels deep
+    
+    At most TREE_MAX_NODES nodes are returned; a response cut short has
+    `truncated` set and can be continued by expanding deeper nodes.
+    """
+    node = tree.find(path)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Path not found")
+    return tree.expand(node, depth, offset=offset, limit=limit, max_nodes=settings.TREE_MAX_NODES)
+
+@router.get("/search")
+async def search_tree(
+    q: str,
+    limit: int = Query(100, ge=1, le=1000),
+    tree: "TreeIndex" = Depends(tree_index)
+):
+    """Find paths by prefix, or by glob when the query has * ? or ["""
+    return {"query": q, "results": tree.search(q, limit)}
+
+@router.get("/stats")
+async def get_tree_stats(tree: "TreeIndex" = Depends(tree_index)):
+    """Get directory tree index statistics"""
+    return tree.stats()
@@ -0,0 +1,140 @@
+# services/chat_service.py
+import logging
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+from models.schemas import ChatResponse, DocumentFilter, MessageRole, normalise_type
+from services.generation import DemoGenerator, Generator
+from utils.single_flight import SingleFlight
+from utils.threads import to_thread
+
+if TYPE_CHECKING:
+    from services.document_service import DocumentService
+    from services.retrieval_service import RetrievalService
+
+logger = logging.getLogger(__name__)
+
+class ChatService:
+    def __init__(
+        self,
+        documents: Optional["DocumentService"] = None,
+        retrieval: Optional["RetrievalService"] = None,
+        generator: Optional[Generator] = None
+    ):
+        self.conversations: Dict[str, List[Dict]] = {}
+        self.documents = documents
+        self.retrieval = retrieval
+        self.generator = generator or DemoGenerator()
+        # Identical concurrent questions share one retrieval + generation run
+        self.single_flight = SingleFlight()
+        
+    async def process_message(
+        self,
+        message: str,
+        conversation_id: str = None,
+        nprobe: Optional[int] = None,
+        filters: Optional[DocumentFilter] = None
+    ) -> ChatResponse:
+        """Process chat message and return response"""
+        
+        if not conversation_id:
+            conversation_id = str(uuid.uuid4())
+            
+        if conversation_id not in self.conversations:
+            self.conversations[conversation_id] = []
+            
+        # Add user message to conversation
+        user_message = {
+            "id": str(uuid.uuid4()),
+            "content": message,
+            "role": MessageRole.USER,
+            "timestamp": datetime.now()
+        }
+        self.conversations[conversation_id].append(user_message)
+        
+        logger.info(f"💬 Processing message: {message[:50]}...")
+        
+        # Concurrent callers with the same query against the same document
+        # set wait on one shared computation; each still gets its own reply
+        response_content, sources = await self.single_flight.do(
+            self._flight_key(message, nprobe, filters),
+            lambda: self._answer(message, nprobe, filters)
+        )
+        
+        response = ChatResponse(
+            id=str(uuid.uuid4()),
+            content=response_content,
+            role=MessageRole.ASSISTANT,
+            timestamp=datetime.now(),
+            conversation_id=conversation_id,
+            sources=[dict(source) for source in sources]
+        )
+        
+        # Add to conversation history
+        self.conversations[conversation_id].append(response.dict())
+        
+        return response
+    
+    def _flight_key(
+        self,
+        message: str,
+        nprobe: Optional[int] = None,
+        filters: Optional[DocumentFilter] = None
+    ) -> Tuple[str, int, Optional[int], Optional[Tuple]]:
+        """Coalescing key: normalised query, document-set version and search knobs"""
+        normalised = " ".join(message.casefold().split())
+        version = self.documents.version if self.documents else 0
+        return normalised, version, nprobe, self._filter_key(filters)
+    
+    @staticmethod
+    def _filter_key(filters: Optional[DocumentFilter]) -> Optional[Tuple]:
+        """Order-insensitive, hashable form of the filter criteria"""
+        if filters is None or filters.is_empty():
+            return None
+        return (
+            tuple(sorted({normalise_type(kind) for kind in filters.types})) if filters.types is not None else None,
+            filters.uploaded_after.timestamp() if filters.uploaded_after else None,
+            filters.uploaded_before.timestamp() if filters.uploaded_before else None,
+            tuple(sorted(set(filters.document_ids))) if filters.document_ids is not None else None
+        )
+    
+    async def _answer(
+        self,
+        message: str,
+        nprobe: Optional[int] = None,
+        filters: Optional[DocumentFilter] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Retrieve and generate - shared by all coalesced callers"""
+        
+        sources = []
+        if self.retrieval:
+            sources = await to_thread(self.retrieval.search, message, nprobe=nprobe, filters=filters)
+        
+        response_content = await self._generate_response(message, sources)
+        
+        return response_content, sources
+    
+    async def _generate_response(self, message: str, sources: List[Dict[str, Any]]) -> str:
+        """Generate AI response from the configured generator backend"""
+        return await self.generator.generate(message, sources)
+    
+    async def get_conversation_history(self, conversation_id: str) -> List[Dict]:
+        """Get conversation history"""
+        return self.conversations.get(conversation_id, [])
+    
+    async def clear_conversation(self, conversation_id: str) -> bool:
+        """Clear conversation history"""
+        if conversation_id in self.conversations:
+            del self.conversations[conversation_id]
+            return True
+        return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Request coalescing statistics"""
+        stats = {
+            "single_flight": self.single_flight.stats(),
+            "generator": self.generator.stats()
+        }
+        if self.retrieval:
+            stats["retrieval"] = self.retrieval.stats()
+        return stats
\ No newline at end of file
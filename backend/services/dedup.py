@@ -0,0 +1,247 @@
+# services/dedup.py
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Shingles are 8-byte windows of the normalised UTF-8 text, read as uint64
+SHINGLE_BYTES = 8
+
+
+class MinHasher:
+    """Vectorised MinHash signatures over byte 8-gram shingles.
+
+    Text is case-folded and whitespace-collapsed, every 8-byte window is
+    read straight out of the buffer as one uint64, and all permutations are
+    applied at once as multiply-shift hashes ((a * x + b) mod 2^64) >> 32.
+    Per-chunk minima come from one `minimum.reduceat` per batch.
+
+    To cut hashing work, only shingles whose hash falls in a fixed 1/`sample`
+    slice are kept; the choice depends on the shingle alone, so documents
+    sharing text keep the same shingles. Chunks with fewer than
+    `min_shingles` windows keep all of them.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        seed: int = 0,
+        sample: int = 4,
+        min_shingles: int = 64,
+        batch_windows: int = 8192
+    ):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.sample = sample
+        self.min_shingles = min_shingles
+        self.batch_windows = batch_windows
+        self._a = (rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)[:, None]
+        self._mix = rng.integers(1, 2**63, dtype=np.uint64) | np.uint64(1)
+
+    def _shingles(self, texts: List[str]):
+        """Kept shingles of all texts back to back, plus per-text counts"""
+        encoded = [" ".join(text.casefold().split()).encode("utf-8").ljust(SHINGLE_BYTES) for text in texts]
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        lengths = np.array([len(chunk) for chunk in encoded], dtype=np.int64)
+        counts = lengths - SHINGLE_BYTES + 1
+
+        # Window starts for every text, skipping windows that straddle two texts
+        text_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        window_offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        starts = np.arange(counts.sum()) + np.repeat(text_starts - window_offsets, counts)
+        shingles = np.ascontiguousarray(sliding_window_view(data, SHINGLE_BYTES)[starts]).view("<u8").ravel()
+
+        owner = np.repeat(np.arange(len(texts)), counts)
+        keep = (shingles * self._mix >> np.uint64(32)) % np.uint64(self.sample) == 0
+        keep |= (counts < self.min_shingles)[owner]
+        # Never leave a text without shingles
+        keep |= (np.bincount(owner[keep], minlength=len(texts)) == 0)[owner]
+        return shingles[keep], np.bincount(owner[keep], minlength=len(texts))
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """MinHash signature per text, shape (len(texts), num_perm), uint32"""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        if not texts:
+            return result
+
+        shingles, counts = self._shingles(texts)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        first = 0
+        while first < len(texts):
+            # Group texts so one batch stays around `batch_windows` shingles
+            last = int(np.searchsorted(offsets, offsets[first] + self.batch_windows, side="right")) - 1
+            last = min(max(last, first + 1), len(texts))
+            lo, hi = offsets[first], offsets[last]
+            # In place on one (num_perm x shingles) buffer, small enough for cache
+            hashed = np.multiply(self._a, shingles[None, lo:hi])
+            hashed += self._b
+            hashed >>= np.uint64(32)
+            result[first:last] = np.minimum.reduceat(hashed, offsets[first:last] - lo, axis=1).T
+            first = last
+        return result
+
+
+class NearDuplicateIndex:
+    """LSH over MinHash signatures to find near-duplicate chunks.
+
+    Signatures are cut into `bands` bands; chunks sharing any band hash are
+    candidates, and a candidate is a match when the fraction of equal
+    signature entries (the Jaccard estimate) reaches `threshold`. Only
+    canonical chunks are added; duplicates just reference one of them.
+
+    Kept per canonical chunk: the low 8 bits of each signature entry for
+    verification (a chance agreement of 1/256 raises the estimate by at
+    most 0.4%), in a (capacity, num_perm) uint8 array that grows by
+    doubling, and one 32-bit band hash plus a 32-bit chunk id per band.
+    Band entries live in a sorted array (searched with `searchsorted`)
+    plus a small sorted buffer of recent additions merged in when full;
+    removed chunks are dropped lazily. With the default 128 permutations
+    and 16 bands that is about 270 bytes per canonical chunk, roughly the
+    size of one IVF int8 vector: with the IVF index, deduplication removes
+    redundant sources and embedding work but does not shrink memory. It
+    pays for itself against the exact float32 index (1 KiB per vector).
+    """
+
+    # Band entries buffered before they are merged into the sorted arrays
+    RECENT_LIMIT = 4096
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        threshold: float = 0.8,
+        seed: int = 0,
+        capacity: int = 256
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.default_rng(seed + 1)
+        self._band_mix = rng.integers(1, 2**63, self.rows, dtype=np.uint64) | np.uint64(1)
+        # Per-band salt so equal hashes in different bands never collide
+        self._band_salt = rng.integers(0, 2**63, bands, dtype=np.uint64)
+        self._keys = np.empty(0, dtype=np.uint32)
+        self._ids = np.empty(0, dtype=np.int32)
+        self._recent_keys = np.empty(0, dtype=np.uint32)
+        self._recent_ids = np.empty(0, dtype=np.int32)
+        self._stale_count = 0
+        # Row r holds the signature of chunk _row_ids[r]; _id_rows maps back (-1: none)
+        self._count = 0
+        self._signatures = np.empty((capacity, num_perm), dtype=np.uint8)
+        self._row_ids = np.empty(capacity, dtype=np.int64)
+        self._id_rows = np.full(capacity, -1, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _reserve(self, chunk_id: int):
+        """Grow the row buffers (doubling) and the id map to fit one more chunk"""
+        if self._count == len(self._signatures):
+            capacity = len(self._signatures) * 2
+            signatures = np.empty((capacity, self._signatures.shape[1]), dtype=np.uint8)
+            signatures[:self._count] = self._signatures[:self._count]
+            row_ids = np.empty(capacity, dtype=np.int64)
+            row_ids[:self._count] = self._row_ids[:self._count]
+            self._signatures, self._row_ids = signatures, row_ids
+        if chunk_id >= len(self._id_rows):
+            id_rows = np.full(max(chunk_id + 1, len(self._id_rows) * 2), -1, dtype=np.int32)
+            id_rows[:len(self._id_rows)] = self._id_rows
+            self._id_rows = id_rows
+
+    def _row(self, chunk_id: int) -> int:
+        return int(self._id_rows[chunk_id]) if chunk_id < len(self._id_rows) else -1
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        return self.hasher.signatures(texts)
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """One uint32 hash per band, shape (n, bands)"""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        mixed = (banded * self._band_mix).sum(axis=2) ^ self._band_salt
+        return (mixed >> np.uint64(32)).astype(np.uint32)
+
+    @staticmethod
+    def _lookup(sorted_keys: np.ndarray, ids: np.ndarray, keys: np.ndarray, found: set):
+        lo = np.searchsorted(sorted_keys, keys, side="left")
+        hi = np.searchsorted(sorted_keys, keys, side="right")
+        for start, stop in zip(lo.tolist(), hi.tolist()):
+            if stop > start:
+                found.update(ids[start:stop].tolist())
+
+    def match(self, signature: np.ndarray, keys: np.ndarray) -> Optional[int]:
+        """Best indexed chunk at or above the threshold, None if there is none"""
+        candidates = set()
+        self._lookup(self._keys, self._ids, keys, candidates)
+        self._lookup(self._recent_keys, self._recent_ids, keys, candidates)
+        if not candidates:
+            return None
+        # Removed chunks linger in the band arrays until the next merge
+        rows = self._id_rows[np.fromiter(candidates, dtype=np.int64, count=len(candidates))]
+        rows = rows[rows >= 0]
+        if not len(rows):
+            return None
+        agreement = np.count_nonzero(self._signatures[rows] == signature.astype(np.uint8), axis=1)
+        best = int(np.argmax(agreement))
+        if agreement[best] < self.threshold * len(signature):
+            return None
+        return int(self._row_ids[rows[best]])
+
+    def add(self, chunk_id: int, signature: np.ndarray, keys: Optional[np.ndarray] = None):
+        if keys is None:
+            keys = self.band_keys(signature[None, :])[0]
+        self._reserve(chunk_id)
+        self._signatures[self._count] = signature.astype(np.uint8)
+        self._row_ids[self._count] = chunk_id
+        self._id_rows[chunk_id] = self._count
+        self._count += 1
+
+        keys = np.sort(keys)
+        positions = np.searchsorted(self._recent_keys, keys)
+        self._recent_keys = np.insert(self._recent_keys, positions, keys)
+        self._recent_ids = np.insert(self._recent_ids, positions, chunk_id)
+        if len(self._recent_keys) >= self.RECENT_LIMIT:
+            self._merge()
+
+    def remove(self, chunk_id: int):
+        """Drop a chunk; its band entries go at the next compaction"""
+        row = self._row(chunk_id)
+        if row >= 0:
+            # Move the last row into the hole
+            last = self._count - 1
+            if row != last:
+                moved = int(self._row_ids[last])
+                self._signatures[row] = self._signatures[last]
+                self._row_ids[row] = moved
+                self._id_rows[moved] = row
+            self._id_rows[chunk_id] = -1
+            self._count = last
+            self._stale_count += self.bands
+            if self._stale_count > max(self.RECENT_LIMIT, len(self._keys) // 2):
+                self._compact()
+
+    def _merge(self):
+        """Fold the recent buffer into the sorted arrays in one linear pass"""
+        positions = np.searchsorted(self._keys, self._recent_keys, side="right")
+        self._keys = np.insert(self._keys, positions, self._recent_keys)
+        self._ids = np.insert(self._ids, positions, self._recent_ids)
+        self._recent_keys = np.empty(0, dtype=np.uint32)
+        self._recent_ids = np.empty(0, dtype=np.int32)
+
+    def _compact(self):
+        """Drop band entries of removed chunks"""
+        self._merge()
+        live = self._id_rows[self._ids] >= 0
+        self._keys, self._ids = self._keys[live], self._ids[live]
+        self._stale_count = 0
+
+    def memory_bytes(self) -> int:
+        """Bytes held: row buffers, id map and band arrays"""
+        arrays = (
+            self._signatures, self._row_ids, self._id_rows,
+            self._keys, self._ids, self._recent_keys, self._recent_ids
+        )
+        return sum(array.nbytes for array in arrays)
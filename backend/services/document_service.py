@@ -4,20 +4,46 @@ import uuid
 import logging
 import aiofiles
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from pathlib import Path
 from fastapi import UploadFile
 
 from models.schemas import DocumentInfo, DocumentUploadResponse
 from config import settings
+from utils.threads import to_thread
+
+if TYPE_CHECKING:
+    from services.retrieval_service import RetrievalService
 
 logger = logging.getLogger(__name__)
 
+# Extensions that can be indexed without a parser
+TEXT_EXTENSIONS = {".txt", ".md"}
+
+# Parsers are optional and imported on first use to keep startup fast
+def _extract_pdf_text(file_path: Path) -> Optional[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return "\n".join(page.extract_text() or "" for page in PdfReader(str(file_path)).pages)
+
+def _extract_docx_text(file_path: Path) -> Optional[str]:
+    try:
+        import docx
+    except ImportError:
+        return None
+    return "\n".join(paragraph.text for paragraph in docx.Document(str(file_path)).paragraphs)
+
 class DocumentService:
-    def __init__(self):
+    def __init__(self, retrieval: Optional["RetrievalService"] = None):
         self.documents: Dict[str, DocumentInfo] = {}
+        self.retrieval = retrieval
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.upload_dir.mkdir(exist_ok=True)
+        # Bumped on every change to the document set, so answers computed
+        # against an older set are never shared with newer requests
+        self.version = 0
         
     async def upload_document(self, file: UploadFile) -> DocumentUploadResponse:
         """Upload and process document"""
@@ -55,8 +81,8 @@ class DocumentService:
             
             logger.info(f"📄 Document uploaded: {file.filename} ({len(content)} bytes)")
             
-            # TODO: Process document for RAG (extract text, create embeddings, etc.)
             await self._process_document(file_path, doc_info)
+            self.version += 1
             
             return DocumentUploadResponse(
                 id=file_id,
@@ -67,28 +93,64 @@ class DocumentService:
             
         except Exception as e:
             # Cleanup on error
-            if file_path.exists():
-                file_path.unlink()
+            self.documents.pop(file_id, None)
+            for path in (file_path, self._sidecar_path(file_id)):
+                if path.exists():
+                    path.unlink()
             logger.error(f"❌ Upload failed: {str(e)}")
             raise e
     
     async def _process_document(self, file_path: Path, doc_info: DocumentInfo):
-        """Process document for RAG - placeholder for actual implementation"""
-        
-        # This is where you'd add:
-        # 1. Text extraction (PDF, DOCX, etc.)
-        # 2. Text chunking
-        # 3. Embedding generation
-        # 4. Vector store updates
+        """Process document for RAG: extract text, chunk, embed and index"""
         
         logger.info(f"🔄 Processing document: {doc_info.filename}")
         
-        # Simulate processing
-        import asyncio
-        await asyncio.sleep(0.5)
+        text = await self._extract_text(file_path)
+        if text is None:
+            logger.warning(f"⚠️ No text extractor for {file_path.suffix} (install pypdf / python-docx), not indexed: {doc_info.filename}")
+        elif self.retrieval:
+            text_path = await self._text_source(file_path, doc_info.id, text)
+            # Embedding and index training are CPU-bound: keep them off the event loop
+            await to_thread(self.retrieval.add_document, doc_info, text, text_path)
         
         logger.info(f"✅ Document processed: {doc_info.filename}")
     
+    async def _extract_text(self, file_path: Path) -> Optional[str]:
+        """Extract plain text, or None when no parser is available"""
+        suffix = file_path.suffix.lower()
+        if suffix in TEXT_EXTENSIONS:
+            # Binary read: no newline translation, so offsets match the file
+            async with aiofiles.open(file_path, 'rb') as f:
+                return (await f.read()).decode('utf-8', errors='replace')
+        if suffix == ".pdf":
+            return await to_thread(_extract_pdf_text, file_path)
+        if suffix == ".docx":
+            return await to_thread(_extract_docx_text, file_path)
+        return None
+    
+    async def _text_source(self, file_path: Path, document_id: str, text: str) -> Path:
+        """File whose UTF-8 bytes are exactly `text`, for mmap-ed snippets
+        
+        Clean UTF-8 text uploads are used as-is; anything else (parsed PDF or
+        DOCX, undecodable bytes) gets an extracted-text sidecar next to it.
+        """
+        if file_path.suffix.lower() in TEXT_EXTENSIONS and "\ufffd" not in text:
+            return file_path
+        sidecar = self._sidecar_path(document_id)
+        async with aiofiles.open(sidecar, 'wb') as f:
+            await f.write(text.encode('utf-8'))
+        return sidecar
+    
+    def _sidecar_path(self, document_id: str) -> Path:
+        return self.upload_dir / f"{document_id}.extracted.txt"
+    
+    def get_document_path(self, document_id: str) -> Optional[Path]:
+        """Path of the stored upload, if the document exists"""
+        doc_info = self.documents.get(document_id)
+        if not doc_info:
+            return None
+        return self.upload_dir / f"{document_id}{Path(doc_info.filename).suffix}"
+    
     def _is_allowed_file(self, filename: str) -> bool:
         """Check if file extension is allowed"""
         if not filename:
@@ -109,17 +171,20 @@ class DocumentService:
             return False
             
         doc_info = self.documents[document_id]
-        file_path = self.upload_dir / f"{document_id}{Path(doc_info.filename).suffix}"
+        file_path = self.get_document_path(document_id)
+        
+        # Remove from index first: it unmaps the files deleted below
+        if self.retrieval:
+            await to_thread(self.retrieval.remove_document, document_id)
         
-        # Delete file
-        if file_path.exists():
-            file_path.unlink()
+        # Delete file and any extracted-text sidecar
+        for path in (file_path, self._sidecar_path(document_id)):
+            if path.exists():
+                path.unlink()
             
         # Remove from memory
         del self.documents[document_id]
+        self.version += 1
         
         logger.info(f"🗑️ Document deleted: {doc_info.filename}")
-        return True
-
-# Global instance
-document_service = DocumentService()
\ No newline at end of file
+        return True
\ No newline at end of file
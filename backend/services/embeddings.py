@@ -0,0 +1,50 @@
+# services/embeddings.py
+import re
+import zlib
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8"))
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embeddings via the signed hashing trick.
+
+    Stand-in for a real embedding model: no weights to load, stable across
+    processes, and produces unit-length float32 vectors so cosine similarity
+    is a plain dot product.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> Tuple[List[int], List[float]]:
+        buckets, signs = [], []
+        for token in _TOKEN_RE.findall(text.lower()):
+            h = _token_hash(token)
+            buckets.append(h % self.dim)
+            signs.append(1.0 if h & 0x80000000 else -1.0)
+        return buckets, signs
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts into an (n, dim) float32 matrix"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets, signs = self._features(text)
+            if buckets:
+                np.add.at(vectors[row], buckets, signs)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text into a (dim,) float32 vector"""
+        return self.embed([text])[0]
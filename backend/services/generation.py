@@ -0,0 +1,63 @@
+# services/generation.py
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from config import settings
+
+
+class Generator(ABC):
+    """Generation backend used by ChatService"""
+
+    @abstractmethod
+    async def generate(self, message: str, sources: List[Dict[str, Any]]) -> str:
+        """Answer `message` from the retrieved `sources`"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+    async def aclose(self):
+        pass
+
+
+class DemoGenerator(Generator):
+    """Canned responses, no model server required"""
+
+    async def generate(self, message: str, sources: List[Dict[str, Any]]) -> str:
+        # Simulate processing time
+        await asyncio.sleep(1)
+
+        # Simple demo responses
+        if "hello" in message.lower():
+            return "Hello! I'm your RAG assistant. I can help you with questions about your uploaded documents. What would you like to know?"
+
+        elif "document" in message.lower():
+            return "I can see you have several documents uploaded. Based on the content, I can help answer questions about them. Please be more specific about what you'd like to know."
+
+        elif "?" in message:
+            return f"That's an interesting question about '{message}'. Based on the documents you've uploaded, here's what I can tell you:\n\n• This is a demo response\n• In a real system, I would search through your documents\n• And provide relevant answers with source citations\n\nWould you like me to search for something more specific?"
+
+        else:
+            return f"I understand you're asking about: '{message}'. While this is a demo response, a full RAG system would:\n\n1. 🔍 Search through your uploaded documents\n2. 📄 Find relevant passages\n3. 🤖 Generate an informed response\n4. 📚 Provide source citations\n\nPlease upload some documents and ask specific questions to see the full functionality!"
+
+
+def create_generator(kind: str) -> Generator:
+    """Build the generation backend by name ("demo" or "http")"""
+    if kind == "demo":
+        return DemoGenerator()
+    if kind == "http":
+        # Imported here so httpx only loads when a model server is configured
+        from services.http_generator import HTTPGenerator
+        return HTTPGenerator(
+            base_url=settings.LLM_BASE_URL,
+            model=settings.LLM_MODEL,
+            max_tokens=settings.LLM_MAX_TOKENS,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            http2=settings.LLM_HTTP2,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+            read_timeout=settings.LLM_READ_TIMEOUT,
+            max_retries=settings.LLM_MAX_RETRIES,
+            retry_backoff=settings.LLM_RETRY_BACKOFF
+        )
+    raise ValueError(f"Unknown generator type: {kind}")
@@ -0,0 +1,149 @@
+# services/http_generator.py
+import asyncio
+import importlib.util
+import json
+import logging
+import random
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+
+from services.generation import Generator
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You are a RAG assistant. Answer using the provided document context "
+    "and cite the source filenames you relied on."
+)
+
+
+class RetryableError(Exception):
+    """Generation attempt failed before any token arrived"""
+
+
+class HTTPGenerator(Generator):
+    """Streams completions from an OpenAI-compatible model server.
+
+    One pooled `httpx.AsyncClient` (keep-alive, HTTP/2 when `h2` is
+    installed) is shared by every request, and a semaphore caps how many
+    generations are in flight. Attempts that fail before the first token
+    are retried with exponential backoff and jitter; a stream that breaks
+    midway is not, since the partial answer cannot be resumed.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        max_tokens: int = 256,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        http2: bool = True,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 2,
+        retry_backoff: float = 0.25
+    ):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("⚠️ HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.tokens = 0
+        self.in_flight = 0
+
+    def _payload(self, message: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        context = "\n\n".join(
+            f"[{source['filename']}] {source.get('snippet', '')}".rstrip()
+            for source in sources
+        )
+        return {
+            "model": self.model,
+            "stream": True,
+            "max_tokens": self.max_tokens,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {message}" if context else message}
+            ]
+        }
+
+    async def stream(self, message: str, sources: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Yield tokens as the server streams them"""
+        payload = self._payload(message, sources)
+        async with self.client.stream("POST", "/v1/chat/completions", json=payload) as response:
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableError(f"Model server returned {response.status_code}")
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                # Usage-only chunks (stream_options.include_usage) carry no choices
+                choices = json.loads(data).get("choices")
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                if delta.get("content"):
+                    yield delta["content"]
+
+    async def generate(self, message: str, sources: List[Dict[str, Any]]) -> str:
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                return await self._generate_with_retry(message, sources)
+            finally:
+                self.in_flight -= 1
+
+    async def _generate_with_retry(self, message: str, sources: List[Dict[str, Any]]) -> str:
+        for attempt in range(self.max_retries + 1):
+            tokens: List[str] = []
+            try:
+                async for token in self.stream(message, sources):
+                    tokens.append(token)
+                self.tokens += len(tokens)
+                return "".join(tokens)
+            except (RetryableError, httpx.TransportError) as e:
+                # Only safe to retry if nothing was streamed yet
+                if tokens or attempt == self.max_retries:
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                delay = self.retry_backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"⚠️ Generation attempt {attempt + 1} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "tokens": self.tokens,
+            "in_flight": self.in_flight
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
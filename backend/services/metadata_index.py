@@ -0,0 +1,149 @@
+# services/metadata_index.py
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.schemas import DocumentFilter, DocumentInfo, normalise_type
+
+
+class MetadataIndex:
+    """Bitmap indexes over document attributes for filtered retrieval.
+
+    Every live document owns a slot; each attribute value (file type) has a
+    bool bitmap over the slots and upload times sit in a parallel float
+    array, so a filter is evaluated with a handful of vectorised operations
+    over documents rather than chunks. `chunk_mask` exposes the result by
+    chunk id for the vector index to apply while scoring.
+    """
+
+    def __init__(self, capacity: int = 1024, chunk_capacity: int = 16384):
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._capacity = capacity
+        # One spare slot at the end stays False: chunk ids that belong to no
+        # document map to -1 and so land on it when expanding a mask
+        self._live = np.zeros(capacity + 1, dtype=bool)
+        self._uploaded = np.zeros(capacity + 1, dtype=np.float64)
+        self._types: Dict[str, np.ndarray] = {}
+        # chunk id -> document slot
+        self._chunk_slot = np.full(chunk_capacity, -1, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _grow(self):
+        capacity = self._capacity * 2
+
+        def resized(array: np.ndarray) -> np.ndarray:
+            grown = np.zeros(capacity + 1, dtype=array.dtype)
+            grown[:self._capacity] = array[:self._capacity]
+            return grown
+
+        self._live = resized(self._live)
+        self._uploaded = resized(self._uploaded)
+        self._types = {kind: resized(bitmap) for kind, bitmap in self._types.items()}
+        self._capacity = capacity
+
+    def _reserve_chunks(self, max_chunk_id: int):
+        if max_chunk_id < len(self._chunk_slot):
+            return
+        grown = np.full(max(max_chunk_id + 1, len(self._chunk_slot) * 2), -1, dtype=np.int32)
+        grown[:len(self._chunk_slot)] = self._chunk_slot
+        self._chunk_slot = grown
+
+    def add(self, doc_info: DocumentInfo, chunk_ids: np.ndarray):
+        """Index a document's attributes and map its chunk ids to it"""
+        if doc_info.id in self._slots:
+            self.remove(doc_info.id)
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot >= self._capacity:
+                self._grow()
+
+        kind = normalise_type(doc_info.type)
+        if kind not in self._types:
+            self._types[kind] = np.zeros(self._capacity + 1, dtype=bool)
+        self._types[kind][slot] = True
+        self._uploaded[slot] = doc_info.upload_time.timestamp()
+        self._live[slot] = True
+        self._slots[doc_info.id] = slot
+
+        if len(chunk_ids):
+            self._reserve_chunks(int(chunk_ids.max()))
+            self._chunk_slot[chunk_ids] = slot
+
+    def remove(self, document_id: str, chunk_ids: Optional[np.ndarray] = None):
+        """Forget a document; its slot is reused by a later upload"""
+        slot = self._slots.pop(document_id, None)
+        if slot is None:
+            return
+        self._live[slot] = False
+        for bitmap in self._types.values():
+            bitmap[slot] = False
+        if chunk_ids is not None and len(chunk_ids):
+            self._chunk_slot[chunk_ids] = -1
+        self._free.append(slot)
+
+    def document_mask(self, filters: Optional[DocumentFilter]) -> Optional[np.ndarray]:
+        """Bitmap of document slots matching all criteria, None when unfiltered"""
+        if filters is None or filters.is_empty():
+            return None
+
+        mask = self._live.copy()
+        if filters.types is not None:
+            selected = np.zeros_like(mask)
+            for kind in filters.types:
+                bitmap = self._types.get(normalise_type(kind))
+                if bitmap is not None:
+                    selected |= bitmap
+            mask &= selected
+        if filters.document_ids is not None:
+            selected = np.zeros_like(mask)
+            slots = [self._slots[doc_id] for doc_id in filters.document_ids if doc_id in self._slots]
+            selected[slots] = True
+            mask &= selected
+        if filters.uploaded_after is not None:
+            mask &= self._uploaded >= filters.uploaded_after.timestamp()
+        if filters.uploaded_before is not None:
+            mask &= self._uploaded <= filters.uploaded_before.timestamp()
+        return mask
+
+    def chunk_mask(self, filters: Optional[DocumentFilter]) -> Optional["ChunkMask"]:
+        """Mask indexable by chunk id, None when unfiltered"""
+        mask = self.document_mask(filters)
+        if mask is None:
+            return None
+        return ChunkMask(mask, self._chunk_slot)
+
+    def types(self) -> Dict[str, int]:
+        """Live document count per file type"""
+        return {kind: int(bitmap.sum()) for kind, bitmap in self._types.items() if bitmap.any()}
+
+
+class ChunkMask:
+    """Document-level filter bitmap viewed through chunk ids.
+
+    `mask[chunk_ids]` resolves only the ids asked for, so an index that
+    scores a few inverted lists never expands the filter to every chunk.
+    """
+
+    def __init__(self, document_mask: np.ndarray, chunk_slot: np.ndarray, extra: Optional[np.ndarray] = None):
+        self.document_mask = document_mask
+        self.chunk_slot = chunk_slot
+        self.extra = extra
+
+    def __getitem__(self, chunk_ids):
+        allowed = self.document_mask[self.chunk_slot[chunk_ids]]
+        if self.extra is not None:
+            allowed = allowed | np.isin(chunk_ids, self.extra)
+        return allowed
+
+    def including(self, chunk_ids: np.ndarray) -> "ChunkMask":
+        """Same mask that also allows the given chunk ids"""
+        return ChunkMask(self.document_mask, self.chunk_slot, np.unique(chunk_ids))
+
+    def any(self) -> bool:
+        return bool(self.document_mask.any()) or (self.extra is not None and len(self.extra) > 0)
@@ -0,0 +1,102 @@
+# services/providers.py
+"""
+Lazy service providers.
+
+Services are built on first use (or by `warm_up()` in the app lifespan),
+never at import time, so importing the app stays cheap and heavy
+dependencies such as NumPy only load when retrieval is actually needed.
+Routes get services through FastAPI `Depends(...)` on these functions.
+"""
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+if TYPE_CHECKING:
+    from services.chat_service import ChatService
+    from services.document_service import DocumentService
+    from services.generation import Generator
+    from services.retrieval_service import RetrievalService
+    from services.tree_index import TreeIndex
+
+logger = logging.getLogger(__name__)
+
+_instances: Dict[str, Any] = {}
+_init_seconds: Dict[str, float] = {}
+# Sync dependencies run in FastAPI's threadpool, so concurrent first
+# requests race to build; re-entrant because factories nest
+_build_lock = threading.RLock()
+
+
+def _provide(name: str, factory: Callable[[], Any]) -> Any:
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _build_lock:
+        # Another thread may have built it while we waited
+        instance = _instances.get(name)
+        if instance is None:
+            started = time.perf_counter()
+            instance = factory()
+            _init_seconds[name] = time.perf_counter() - started
+            _instances[name] = instance
+            logger.info(f"🔧 Initialized {name} in {_init_seconds[name] * 1000:.1f} ms")
+    return instance
+
+
+def get_retrieval_service() -> "RetrievalService":
+    def build():
+        from services.retrieval_service import RetrievalService
+        return RetrievalService()
+    return _provide("retrieval_service", build)
+
+
+def get_document_service() -> "DocumentService":
+    def build():
+        from services.document_service import DocumentService
+        return DocumentService(get_retrieval_service())
+    return _provide("document_service", build)
+
+
+def get_generator() -> "Generator":
+    def build():
+        from config import settings
+        from services.generation import create_generator
+        return create_generator(settings.GENERATOR)
+    return _provide("generator", build)
+
+
+def get_chat_service() -> "ChatService":
+    def build():
+        from services.chat_service import ChatService
+        return ChatService(get_document_service(), get_retrieval_service(), get_generator())
+    return _provide("chat_service", build)
+
+
+def get_tree_index() -> "TreeIndex":
+    def build():
+        from config import BACKEND_DIR, settings
+        from services.tree_index import TreeIndex
+        return TreeIndex.load(str(BACKEND_DIR / settings.TREE_SOURCE))
+    return _provide("tree_index", build)
+
+
+def warm_up():
+    """Build every service up front (called from the app lifespan)"""
+    get_chat_service()
+
+
+async def shutdown():
+    """Release service resources: shard worker processes, pooled connections"""
+    retrieval = _instances.get("retrieval_service")
+    if retrieval is not None:
+        retrieval.close()
+    generator = _instances.get("generator")
+    if generator is not None:
+        await generator.aclose()
+    _instances.clear()
+
+
+def init_times() -> Dict[str, float]:
+    """Seconds spent constructing each service built so far"""
+    return dict(_init_seconds)
@@ -0,0 +1,311 @@
+# services/retrieval_service.py
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from models.schemas import DocumentFilter, DocumentInfo
+from services.dedup import NearDuplicateIndex
+from services.embeddings import HashingEmbedder
+from services.metadata_index import MetadataIndex
+from services.snippets import SnippetReader, byte_spans
+from services.vector_index import create_index
+from utils.rwlock import ReadWriteLock
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_text(text: str, size: int, overlap: int) -> List[Tuple[int, int]]:
+    """Split text into overlapping windows, returned as (start, end) offsets"""
+    if not text:
+        return []
+    step = max(size - overlap, 1)
+    spans = []
+    for start in range(0, len(text), step):
+        end = min(start + size, len(text))
+        spans.append((start, end))
+        if end == len(text):
+            break
+    return spans
+
+
+class RetrievalService:
+    """Chunk store and vector index behind chat retrieval
+
+    Callers run it off the event loop (utils.threads.to_thread). Searches
+    share a read lock and run in parallel. Updates are serialised by a
+    writer mutex and do their slow parts (embedding, dedup, IVF k-means)
+    before taking the write lock, which covers only the publishing step.
+    Snippets are built after the read lock is released, from pinned maps.
+    """
+
+    def __init__(self, index=None, deduplicate: Optional[bool] = None):
+        self.embedder = HashingEmbedder(settings.EMBEDDING_DIM)
+        self.index = index if index is not None else create_index(
+            settings.VECTOR_INDEX,
+            settings.EMBEDDING_DIM,
+            **self._index_options()
+        )
+        self.snippets = SnippetReader()
+        self.metadata = MetadataIndex()
+        if deduplicate is None:
+            deduplicate = settings.DEDUP_ENABLED
+        self.dedup = NearDuplicateIndex(
+            settings.MINHASH_PERMUTATIONS,
+            settings.LSH_BANDS,
+            settings.DEDUP_THRESHOLD
+        ) if deduplicate else None
+        self.chunks: Dict[int, Dict[str, Any]] = {}
+        self.document_chunks: Dict[str, List[int]] = {}
+        # canonical chunk id -> chunk ids that only reference it
+        self.duplicates: Dict[int, List[int]] = {}
+        self._duplicate_arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._document_paths: Dict[str, str] = {}
+        self._next_chunk_id = 0
+        self._lock = ReadWriteLock()
+        # Serialises updates; dedup state is only touched under it
+        self._writer = threading.Lock()
+
+    @staticmethod
+    def _index_options() -> Dict[str, Any]:
+        if settings.VECTOR_INDEX == "ivf":
+            return {"nlist": settings.IVF_NLIST, "nprobe": settings.IVF_NPROBE}
+        if settings.VECTOR_INDEX == "sharded":
+            return {"shards": settings.RETRIEVAL_SHARDS}
+        return {}
+
+    def add_document(self, doc_info: DocumentInfo, text: str, text_path: Path) -> int:
+        """Chunk, embed and index a document's text, returns chunk count
+
+        `text_path` is a UTF-8 file whose bytes encode exactly `text`;
+        snippets are sliced from it later by byte offset. Chunks that are
+        near-duplicates of an indexed chunk are not embedded or indexed;
+        they only reference it (`duplicate_of`).
+        """
+        spans = chunk_text(text, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+        if not spans:
+            return 0
+        texts = [text[start:end] for start, end in spans]
+        chunk_bytes = byte_spans(text, spans)
+        path = str(text_path)
+
+        with self._writer:
+            chunk_ids = np.arange(self._next_chunk_id, self._next_chunk_id + len(spans), dtype=np.int64)
+            self._next_chunk_id += len(spans)
+
+            canonical = self._find_duplicates(chunk_ids, texts)
+            unique = [position for position, match in enumerate(canonical) if match is None]
+            if unique:
+                vectors = self.embedder.embed([texts[position] for position in unique])
+                if hasattr(self.index, "prepare"):
+                    # IVF k-means runs here, while searches continue
+                    self.index.prepare(vectors)
+
+            chunks = {}
+            for position, chunk_id in enumerate(chunk_ids.tolist()):
+                chunks[chunk_id] = {
+                    "document_id": doc_info.id,
+                    "filename": doc_info.filename,
+                    "chunk": position,
+                    "start": spans[position][0],
+                    "end": spans[position][1],
+                    "path": path,
+                    "byte_start": chunk_bytes[position][0],
+                    "byte_end": chunk_bytes[position][1]
+                }
+                if canonical[position] is not None:
+                    chunks[chunk_id]["duplicate_of"] = canonical[position]
+
+            with self._lock.write():
+                if unique:
+                    self.index.add(chunk_ids[unique], vectors)
+                self.metadata.add(doc_info, chunk_ids)
+                self.chunks.update(chunks)
+                for chunk_id, target in zip(chunk_ids.tolist(), canonical):
+                    if target is not None:
+                        self.duplicates.setdefault(target, []).append(chunk_id)
+                self.document_chunks[doc_info.id] = chunk_ids.tolist()
+                self._document_paths[doc_info.id] = path
+                self._duplicate_arrays = None
+
+        duplicates = len(spans) - len(unique)
+        note = f" ({duplicates} near-duplicates referenced)" if duplicates else ""
+        logger.info(f"🧩 Indexed {len(unique)} chunks for: {doc_info.filename}{note}")
+        return len(spans)
+
+    def _find_duplicates(self, chunk_ids: np.ndarray, texts: List[str]) -> List[Optional[int]]:
+        """Canonical chunk id per new chunk, None for chunks to index"""
+        if self.dedup is None:
+            return [None] * len(texts)
+
+        signatures = self.dedup.signatures(texts)
+        keys = self.dedup.band_keys(signatures)
+        canonical = []
+        for position, chunk_id in enumerate(chunk_ids.tolist()):
+            match = self.dedup.match(signatures[position], keys[position])
+            if match is None:
+                # Later chunks of this document may match this one too
+                self.dedup.add(chunk_id, signatures[position], keys[position])
+            canonical.append(match)
+        return canonical
+
+    def remove_document(self, document_id: str) -> int:
+        """Drop a document's chunks from the index, returns chunk count"""
+        with self._writer:
+            chunk_ids = self.document_chunks.get(document_id, [])
+            removed = set(chunk_ids)
+            indexed = [chunk_id for chunk_id in chunk_ids if "duplicate_of" not in self.chunks[chunk_id]]
+
+            # Another document still holding an indexed chunk's text inherits it:
+            # its first duplicate becomes the indexed chunk
+            successors = {}
+            for chunk_id in indexed:
+                referrers = [referrer for referrer in self.duplicates.get(chunk_id, []) if referrer not in removed]
+                if referrers:
+                    successors[chunk_id] = referrers
+            heirs = [referrers[0] for referrers in successors.values()]
+            texts = [self._chunk_text(heir) for heir in heirs]
+            vectors = self.embedder.embed(texts) if heirs else None
+
+            with self._lock.write():
+                self.document_chunks.pop(document_id, None)
+                path = self._document_paths.pop(document_id, None)
+                self.metadata.remove(document_id, np.asarray(chunk_ids, dtype=np.int64))
+                for chunk_id in chunk_ids:
+                    target = self.chunks.pop(chunk_id).get("duplicate_of")
+                    if target is not None and target not in removed:
+                        referrers = self.duplicates[target]
+                        referrers.remove(chunk_id)
+                        if not referrers:
+                            del self.duplicates[target]
+                for chunk_id in indexed:
+                    self.duplicates.pop(chunk_id, None)
+                for referrers in successors.values():
+                    heir, rest = referrers[0], referrers[1:]
+                    del self.chunks[heir]["duplicate_of"]
+                    for referrer in rest:
+                        self.chunks[referrer]["duplicate_of"] = heir
+                    if rest:
+                        self.duplicates[heir] = rest
+                if indexed:
+                    self.index.remove(np.asarray(indexed, dtype=np.int64))
+                if heirs:
+                    self.index.add(np.asarray(heirs, dtype=np.int64), vectors)
+                self._duplicate_arrays = None
+
+            if self.dedup is not None:
+                for chunk_id in indexed:
+                    self.dedup.remove(chunk_id)
+                for heir, signature in zip(heirs, self.dedup.signatures(texts)):
+                    self.dedup.add(heir, signature)
+
+        if path:
+            # Unmap before the file is deleted; searches still reading it keep it open
+            self.snippets.close(path)
+        return len(chunk_ids)
+
+    def _chunk_text(self, chunk_id: int) -> str:
+        chunk = self.chunks[chunk_id]
+        return self.snippets.read(chunk["path"], chunk["byte_start"], chunk["byte_end"])
+
+    def search(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        filters: Optional[DocumentFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the most relevant chunks for a query as source dicts
+
+        `filters` restrict the search to matching documents; they are applied
+        as a pre-filter while scoring, so top-k is taken over allowed chunks.
+        Near-duplicate chunks collapse into one source; the other documents
+        holding the same text are listed under `duplicates`.
+        """
+        with self._lock.read():
+            if not self.chunks:
+                return []
+
+            allowed = self.metadata.chunk_mask(filters)
+            mask = allowed
+            if allowed is not None and self.duplicates:
+                # An indexed chunk stays eligible when any duplicate of it passes
+                referrers, targets = self._duplicate_index()
+                mask = allowed.including(targets[allowed[referrers]])
+            if mask is not None and not mask.any():
+                return []
+
+            hits = self.index.search(
+                self.embedder.embed_one(query),
+                top_k or settings.RETRIEVAL_TOP_K,
+                nprobe=nprobe,
+                mask=mask
+            )
+
+            found = []
+            for chunk_id, score in hits:
+                if chunk_id not in self.chunks or score <= 0:
+                    continue
+                group = [chunk_id] + self.duplicates.get(chunk_id, [])
+                if allowed is not None and len(group) > 1:
+                    group = [member for member, ok in zip(group, allowed[np.asarray(group)].tolist()) if ok]
+                found.append((score, [self.chunks[member] for member in group]))
+            # Pinned maps outlive a concurrent remove_document's close
+            maps = self.snippets.pin(chunks[0]["path"] for _, chunks in found)
+
+        try:
+            sources = []
+            for score, chunks in found:
+                chunk = chunks[0]
+                source = {
+                    "id": chunk["document_id"],
+                    "filename": chunk["filename"],
+                    "chunk": chunk["chunk"],
+                    "relevance_score": round(score, 4),
+                    **self.snippets.snippet(chunk, query, settings.SNIPPET_CHARS, maps[chunk["path"]])
+                }
+                if len(chunks) > 1:
+                    source["duplicates"] = [
+                        {"id": member["document_id"], "filename": member["filename"], "chunk": member["chunk"]}
+                        for member in chunks[1:]
+                    ]
+                sources.append(source)
+            return sources
+        finally:
+            self.snippets.unpin(maps)
+
+    def _duplicate_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(duplicate chunk ids, their indexed chunk ids) as parallel arrays"""
+        # Searches may race to fill the cache; they compute the same arrays
+        if self._duplicate_arrays is None:
+            referrers = [(referrer, target) for target, members in self.duplicates.items() for referrer in members]
+            pairs = np.asarray(referrers, dtype=np.int64).reshape(-1, 2)
+            self._duplicate_arrays = (pairs[:, 0], pairs[:, 1])
+        return self._duplicate_arrays
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size statistics"""
+        with self._writer, self._lock.read():
+            stats = {
+                "index": type(self.index).__name__,
+                "documents": len(self.document_chunks),
+                "chunks": len(self.chunks),
+                "duplicate_chunks": sum(len(members) for members in self.duplicates.values()),
+                "document_types": self.metadata.types(),
+                "index_bytes": self.index.memory_bytes(),
+                # Signatures and band hashes; compare with index_bytes
+                "dedup_bytes": self.dedup.memory_bytes() if self.dedup is not None else 0
+            }
+            if hasattr(self.index, "shard_sizes"):
+                stats["shard_sizes"] = self.index.shard_sizes()
+            return stats
+
+    def close(self):
+        """Release memory maps and index resources (shard workers)"""
+        self.snippets.close_all()
+        if hasattr(self.index, "close"):
+            self.index.close()
+
@@ -0,0 +1,293 @@
+# services/sharded_index.py
+import atexit
+import heapq
+import logging
+import multiprocessing as mp
+import threading
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.vector_index import SearchResult, top_k
+
+logger = logging.getLogger(__name__)
+
+
+def _attach(names: Tuple[str, str], capacity: int, dim: int):
+    """Map a shard's shared-memory blocks as (ids, vectors) arrays"""
+    id_block = shared_memory.SharedMemory(name=names[0])
+    vector_block = shared_memory.SharedMemory(name=names[1])
+    ids = np.ndarray((capacity,), dtype=np.int64, buffer=id_block.buf)
+    vectors = np.ndarray((capacity, dim), dtype=np.float32, buffer=vector_block.buf)
+    return (id_block, vector_block), ids, vectors
+
+
+def _score(ids: np.ndarray, vectors: np.ndarray, query: np.ndarray, k: int, count: int, allowed: Optional[np.ndarray]) -> SearchResult:
+    """Top-k over the first `count` rows, optionally only the allowed ones"""
+    if allowed is None:
+        return top_k(ids[:count], vectors[:count] @ query, k)
+    # Packed per-row filter bitmap: score only allowed rows
+    rows = np.flatnonzero(np.unpackbits(allowed, count=count))
+    return top_k(ids[rows], vectors[rows] @ query, k)
+
+
+def _shard_worker(conn, names: Tuple[str, str], capacity: int, dim: int):
+    """Worker loop: score the first `count` rows of this shard per query"""
+    blocks, ids, vectors = _attach(names, capacity, dim)
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+
+            command = message[0]
+            if command == "search":
+                _, query, k, count, allowed = message
+                conn.send(_score(ids, vectors, query, k, count, allowed))
+            elif command == "attach":
+                # Shard outgrew its blocks; parent copied rows into new ones
+                _, names, capacity = message
+                del ids, vectors
+                for block in blocks:
+                    block.close()
+                blocks, ids, vectors = _attach(names, capacity, dim)
+                conn.send("ok")
+    finally:
+        del ids, vectors
+        for block in blocks:
+            block.close()
+
+
+class _Shard:
+    """Parent-side handle: owns the shared memory and the worker process"""
+
+    def __init__(self, context, dim: int, capacity: int):
+        self.dim = dim
+        self.count = 0
+        self._context = context
+        self._allocate(capacity)
+        self._spawn()
+
+    def _spawn(self):
+        self.conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_shard_worker,
+            args=(child_conn, self.names, self.capacity, self.dim),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def respawn(self):
+        """Replace a dead worker; the rows are safe in the parent's blocks"""
+        logger.warning(f"⚠️ Shard worker {self.process.pid} died (exit code {self.process.exitcode}), restarting it")
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+        self._spawn()
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.blocks = (
+            shared_memory.SharedMemory(create=True, size=max(capacity * 8, 1)),
+            shared_memory.SharedMemory(create=True, size=max(capacity * self.dim * 4, 1))
+        )
+        self.names = (self.blocks[0].name, self.blocks[1].name)
+        self.ids = np.ndarray((capacity,), dtype=np.int64, buffer=self.blocks[0].buf)
+        self.vectors = np.ndarray((capacity, self.dim), dtype=np.float32, buffer=self.blocks[1].buf)
+
+    def _release(self, blocks):
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    def reserve(self, extra: int):
+        """Grow the shared blocks (doubling) so `extra` more rows fit"""
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        old_blocks, old_ids, old_vectors = self.blocks, self.ids, self.vectors
+        self._allocate(capacity)
+        self.ids[:self.count] = old_ids[:self.count]
+        self.vectors[:self.count] = old_vectors[:self.count]
+        del old_ids, old_vectors
+
+        try:
+            self.conn.send(("attach", self.names, self.capacity))
+            self.conn.recv()
+        except (EOFError, OSError):
+            # A new worker maps the new blocks from the start
+            self.respawn()
+        self._release(old_blocks)
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """Write rows at the tail, returns the first row number used"""
+        self.reserve(len(ids))
+        start = self.count
+        self.ids[start:start + len(ids)] = ids
+        self.vectors[start:start + len(ids)] = vectors
+        self.count += len(ids)
+        return start
+
+    def send_search(self, query: np.ndarray, k: int, allowed: Optional[np.ndarray]) -> bool:
+        """Hand a query to the worker, False if it is gone"""
+        try:
+            self.conn.send(("search", query, k, self.count, allowed))
+            return True
+        except OSError:
+            return False
+
+    def receive_search(self, query: np.ndarray, k: int, allowed: Optional[np.ndarray], sent: bool) -> SearchResult:
+        """The worker's top-k; if it died, score in-process and restart it"""
+        if sent:
+            try:
+                return self.conn.recv()
+            except (EOFError, OSError):
+                pass
+        self.respawn()
+        return _score(self.ids, self.vectors, query, k, self.count, allowed)
+
+    def close(self):
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.conn.close()
+        del self.ids, self.vectors
+        self._release(self.blocks)
+
+
+class ShardedIndex:
+    """Exact index partitioned over worker processes with scatter-gather search.
+
+    Each shard's ids and float32 vectors live in `multiprocessing.shared_memory`
+    written by this process and read in place by the shard's worker, so a query
+    only ships the query vector and a row count. Workers score their shards in
+    parallel and return local top-k lists, which are merged here.
+
+    A worker that dies is restarted from the shard's blocks; the query that
+    found it dead scores that shard in-process instead of failing.
+
+    New vectors go to the least-loaded shard; deletes swap the last row into
+    the hole and then rebalance if shards drift apart, so shard sizes track
+    the document set as it changes.
+    """
+
+    def __init__(self, dim: int, shards: int = 4, initial_capacity: int = 1024, imbalance: float = 0.1):
+        self.dim = dim
+        self.imbalance = imbalance
+        context = mp.get_context("spawn")
+        self.shards = [_Shard(context, dim, initial_capacity) for _ in range(shards)]
+        # chunk id -> (shard number, row)
+        self._where: Dict[int, Tuple[int, int]] = {}
+        # One scatter-gather at a time; mutations only happen between queries
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+        logger.info(f"🧱 Sharded index started with {shards} worker processes")
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def shard_sizes(self) -> List[int]:
+        return [shard.count for shard in self.shards]
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Add unit-length vectors, spreading them over the least-loaded shards"""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            sizes = self.shard_sizes()
+            targets = np.empty(len(ids), dtype=np.int64)
+            for i in range(len(ids)):
+                targets[i] = smallest = min(range(len(sizes)), key=sizes.__getitem__)
+                sizes[smallest] += 1
+
+            for number, shard in enumerate(self.shards):
+                members = np.flatnonzero(targets == number)
+                if len(members):
+                    start = shard.append(ids[members], vectors[members])
+                    for row, chunk_id in enumerate(ids[members].tolist(), start):
+                        self._where[chunk_id] = (number, row)
+
+    def remove(self, ids: np.ndarray) -> int:
+        """Remove vectors by id, returns how many were removed"""
+        removed = 0
+        with self._lock:
+            for chunk_id in np.asarray(ids, dtype=np.int64).tolist():
+                location = self._where.pop(chunk_id, None)
+                if location is not None:
+                    self._delete_row(*location)
+                    removed += 1
+            if removed:
+                self._rebalance()
+        return removed
+
+    def _delete_row(self, number: int, row: int):
+        shard = self.shards[number]
+        last = shard.count - 1
+        if row != last:
+            moved_id = int(shard.ids[last])
+            shard.ids[row] = moved_id
+            shard.vectors[row] = shard.vectors[last]
+            self._where[moved_id] = (number, row)
+        shard.count = last
+
+    def _rebalance(self):
+        """Move tail rows from the largest shard to the smallest until even"""
+        while True:
+            sizes = self.shard_sizes()
+            largest = max(range(len(sizes)), key=sizes.__getitem__)
+            smallest = min(range(len(sizes)), key=sizes.__getitem__)
+            gap = sizes[largest] - sizes[smallest]
+            if gap <= max(1, self.imbalance * sum(sizes) / len(sizes)):
+                return
+
+            moving = gap // 2
+            source, target = self.shards[largest], self.shards[smallest]
+            tail = slice(source.count - moving, source.count)
+            moved_ids = source.ids[tail].copy()
+            start = target.append(moved_ids, source.vectors[tail])
+            source.count -= moving
+            for row, chunk_id in enumerate(moved_ids.tolist(), start):
+                self._where[chunk_id] = (smallest, row)
+            logger.debug(f"⚖️ Moved {moving} rows from shard {largest} to shard {smallest}")
+
+    def search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None, **params) -> SearchResult:
+        """Scatter the query to every shard and merge their top-k lists
+
+        A `mask` (`mask[ids]` yields a bool per id) is translated to a bit-packed
+        per-row bitmap for each shard, so workers skip filtered rows while
+        scoring and only count/8 bytes per shard cross the pipe.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            requests = []
+            for shard in self.shards:
+                if shard.count:
+                    allowed = None if mask is None else np.packbits(mask[shard.ids[:shard.count]])
+                    requests.append((shard, allowed, shard.send_search(query, k, allowed)))
+            partials = [shard.receive_search(query, k, allowed, sent) for shard, allowed, sent in requests]
+
+        # Each partial is already sorted best-first
+        merged = heapq.merge(*partials, key=lambda hit: hit[1], reverse=True)
+        return list(islice(merged, k))
+
+    def memory_bytes(self) -> int:
+        return sum(shard.capacity * (8 + self.dim * 4) for shard in self.shards)
+
+    def close(self):
+        """Stop workers and release shared memory"""
+        if self._closed:
+            return
+        self._closed = True
+        for shard in self.shards:
+            shard.close()
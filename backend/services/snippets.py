@@ -0,0 +1,139 @@
+# services/snippets.py
+import mmap
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def byte_spans(text: str, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Convert character spans in text to UTF-8 byte spans, in one pass"""
+    result = []
+    char_pos = byte_pos = 0
+    for start, end in spans:
+        # Spans are sorted by start; only encode the gaps we walk over
+        byte_pos += len(text[char_pos:start].encode("utf-8"))
+        char_pos = start
+        byte_end = byte_pos + len(text[start:end].encode("utf-8"))
+        result.append((byte_pos, byte_end))
+    return result
+
+
+class SnippetReader:
+    """Slices chunk text straight out of memory-mapped text files.
+
+    Chunks store byte offsets into the upload (or its extracted-text
+    sidecar), so building a snippet only touches the pages of that chunk;
+    the file is never read or copied as a whole. Maps are kept open in a
+    small LRU and closed when their document is removed.
+
+    Safe to share between threads. A map that is pinned (see `pin`) stays
+    open through eviction or `close` until its last pin is released.
+    """
+
+    def __init__(self, max_open: int = 64):
+        self.max_open = max_open
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+        # id(map) -> pin count; pinned maps closed meanwhile wait in _retired
+        self._pins: Dict[int, int] = {}
+        self._retired: Dict[int, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+    def _map(self, path: str) -> mmap.mmap:
+        mapped = self._maps.get(path)
+        if mapped is not None:
+            self._maps.move_to_end(path)
+            return mapped
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[path] = mapped
+        while len(self._maps) > self.max_open:
+            self._release(self._maps.popitem(last=False)[1])
+        return mapped
+
+    def _release(self, mapped: mmap.mmap):
+        if id(mapped) in self._pins:
+            self._retired[id(mapped)] = mapped
+        else:
+            mapped.close()
+
+    def pin(self, paths: Iterable[str]) -> Dict[str, mmap.mmap]:
+        """Map files and keep the maps open until `unpin` is called"""
+        maps = {}
+        with self._lock:
+            for path in set(paths):
+                # Pinned one by one: mapping the next path may evict this one
+                mapped = self._map(path)
+                self._pins[id(mapped)] = self._pins.get(id(mapped), 0) + 1
+                maps[path] = mapped
+        return maps
+
+    def unpin(self, maps: Dict[str, mmap.mmap]):
+        """Release maps returned by `pin`"""
+        with self._lock:
+            for mapped in maps.values():
+                key = id(mapped)
+                self._pins[key] -= 1
+                if not self._pins[key]:
+                    del self._pins[key]
+                    retired = self._retired.pop(key, None)
+                    if retired is not None:
+                        retired.close()
+
+    def read(self, path: str, byte_start: int, byte_end: int, mapped: Optional[mmap.mmap] = None) -> str:
+        """Decode one byte range of a file, from `mapped` when already pinned"""
+        if mapped is None:
+            maps = self.pin([path])
+            try:
+                return self.read(path, byte_start, byte_end, maps[path])
+            finally:
+                self.unpin(maps)
+        with memoryview(mapped)[byte_start:byte_end] as view:
+            return str(view, "utf-8", errors="replace")
+
+    def snippet(
+        self,
+        chunk: Dict[str, Any],
+        query: str,
+        width: int,
+        mapped: Optional[mmap.mmap] = None
+    ) -> Dict[str, Any]:
+        """Best window of a chunk around the query terms, with highlights.
+
+        Offsets in `start`/`end` are character offsets into the document's
+        extracted text; `highlights` are character offsets into `snippet`.
+        """
+        text = self.read(chunk["path"], chunk["byte_start"], chunk["byte_end"], mapped)
+        terms = {token for token in _TOKEN_RE.findall(query.lower()) if len(token) > 1}
+        matches = [m.span() for m in _TOKEN_RE.finditer(text) if m.group().lower() in terms]
+
+        # Centre the window on the first match so the citation is visible
+        window_start = 0
+        if matches and len(text) > width:
+            window_start = max(0, min(matches[0][0] - width // 4, len(text) - width))
+        window_end = min(window_start + width, len(text))
+
+        return {
+            "snippet": text[window_start:window_end],
+            "start": chunk["start"] + window_start,
+            "end": chunk["start"] + window_end,
+            "highlights": [
+                [start - window_start, end - window_start]
+                for start, end in matches
+                if start >= window_start and end <= window_end
+            ]
+        }
+
+    def close(self, path: str):
+        with self._lock:
+            mapped = self._maps.pop(path, None)
+            if mapped is not None:
+                self._release(mapped)
+
+    def close_all(self):
+        with self._lock:
+            while self._maps:
+                self._release(self._maps.popitem()[1])
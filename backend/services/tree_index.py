@@ -0,0 +1,267 @@
+# services/tree_index.py
+import json
+import logging
+import os
+import re
+from bisect import bisect_left
+from collections import deque
+from fnmatch import translate
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same defaults as DirectoryScanner
+DEFAULT_EXCLUDE_DIRS = {".git", "__pycache__", ".vscode", ".idea", "venv", ".venv", "node_modules"}
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+# Sorts after any character a path can contain: upper bound for prefix ranges
+_PREFIX_END = "\U0010ffff"
+
+
+def normalise_path(path: str) -> str:
+    """Relative tree path with '/' separators; the root is '.'"""
+    path = path.strip().replace("\\", "/").strip("/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path or "."
+
+
+class TreeIndex:
+    """Flat, array-backed index over a directory scan.
+
+    Nodes are numbered breadth-first, so every directory's children occupy
+    one contiguous run and expanding a level is a slice, not a search. Per
+    node only a few NumPy arrays are kept (parent, first child, child count,
+    type, size and subtree totals) plus one sorted list of path strings,
+    which serves both exact lookups and prefix/glob search through bisect.
+    Subtree file/directory counts and sizes are aggregated once at build
+    time, deepest level first.
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        parent: np.ndarray,
+        depth: np.ndarray,
+        is_dir: np.ndarray,
+        sizes: Optional[np.ndarray],
+        root_path: str
+    ):
+        count = len(paths)
+        self.root_path = root_path
+        self.parent = parent.astype(np.int32)
+        self.is_dir = is_dir.astype(bool)
+        self.has_sizes = sizes is not None
+
+        # Breadth-first numbering keeps parents non-decreasing
+        self.child_count = np.bincount(self.parent[1:], minlength=count).astype(np.int32)
+        self.first_child = (np.searchsorted(self.parent[1:], np.arange(count, dtype=np.int32)) + 1).astype(np.int32)
+
+        # Subtree totals, folded into parents one level at a time
+        self.size = np.zeros(count, dtype=np.int64) if sizes is None else sizes.astype(np.int64)
+        self.file_count = (~self.is_dir).astype(np.int32)
+        self.dir_count = self.is_dir.astype(np.int32)
+        level_starts = np.searchsorted(depth, np.arange(int(depth[-1]) + 2))
+        for level in range(int(depth[-1]), 0, -1):
+            members = slice(level_starts[level], level_starts[level + 1])
+            for totals in (self.size, self.file_count, self.dir_count):
+                np.add.at(totals, self.parent[members], totals[members])
+        # A directory's dir_count covers its descendants, not itself
+        self.dir_count -= self.is_dir
+
+        # One copy of the path strings, sorted; ranks map nodes to positions
+        self.order = np.array(sorted(range(count), key=paths.__getitem__), dtype=np.int32)
+        self.sorted_paths = [paths[node] for node in self.order]
+        self.rank = np.empty(count, dtype=np.int32)
+        self.rank[self.order] = np.arange(count, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.sorted_paths)
+
+    # --- Building -------------------------------------------------------
+
+    @classmethod
+    def load(cls, source: str, exclude_dirs: Optional[Set[str]] = None) -> "TreeIndex":
+        """Build from a directory (scanned here) or a DirectoryScanner JSON file"""
+        if os.path.isdir(source):
+            return cls.from_directory(source, exclude_dirs)
+        if os.path.isfile(source):
+            with open(source, "r", encoding="utf-8") as f:
+                return cls.from_scan_result(json.load(f))
+        raise FileNotFoundError(f"Tree source not found: {source}")
+
+    @classmethod
+    def from_scan_result(cls, result: Dict[str, Any]) -> "TreeIndex":
+        """Flatten a DirectoryScanner result (`root_path` + nested `content`)"""
+        paths, parent, depth, is_dir = [], [], [], []
+        queue = deque([(result["content"], -1, 0)])
+        while queue:
+            item, parent_node, level = queue.popleft()
+            node = len(paths)
+            paths.append(normalise_path(item["path"]))
+            parent.append(parent_node)
+            depth.append(level)
+            is_dir.append(item["type"] == "directory")
+            for child in item.get("children") or ():
+                queue.append((child, node, level + 1))
+
+        index = cls(paths, np.array(parent), np.array(depth), np.array(is_dir), None, result["root_path"])
+        logger.info(f"🌳 Tree index loaded: {len(index)} nodes from scan of {result['root_path']}")
+        return index
+
+    @classmethod
+    def from_directory(cls, root: str, exclude_dirs: Optional[Set[str]] = None) -> "TreeIndex":
+        """Walk a directory breadth-first, recording file sizes"""
+        exclude_dirs = DEFAULT_EXCLUDE_DIRS if exclude_dirs is None else exclude_dirs
+        root_path = Path(root).resolve()
+        paths, parent, depth, is_dir, sizes = ["."], [-1], [0], [True], [0]
+        queue = deque([(str(root_path), 0, "")])
+        while queue:
+            directory, node, prefix = queue.popleft()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError as e:
+                logger.warning(f"⚠️ Skipping unreadable directory {directory}: {e}")
+                continue
+
+            # Directories first, then files, each sorted - as DirectoryScanner does
+            dirs = sorted((e for e in entries if e.is_dir(follow_symlinks=False) and e.name not in exclude_dirs), key=lambda e: e.name)
+            files = sorted((e for e in entries if not e.is_dir(follow_symlinks=False)), key=lambda e: e.name)
+            for entry in dirs + files:
+                child = len(paths)
+                entry_is_dir = entry.is_dir(follow_symlinks=False)
+                paths.append(prefix + entry.name)
+                parent.append(node)
+                depth.append(depth[node] + 1)
+                is_dir.append(entry_is_dir)
+                if entry_is_dir:
+                    sizes.append(0)
+                    queue.append((entry.path, child, prefix + entry.name + "/"))
+                else:
+                    try:
+                        sizes.append(entry.stat(follow_symlinks=False).st_size)
+                    except OSError:
+                        sizes.append(0)
+
+        index = cls(paths, np.array(parent), np.array(depth), np.array(is_dir), np.array(sizes), str(root_path))
+        logger.info(f"🌳 Tree index built: {len(index)} nodes under {root_path}")
+        return index
+
+    # --- Queries --------------------------------------------------------
+
+    def path(self, node: int) -> str:
+        return self.sorted_paths[self.rank[node]]
+
+    def find(self, path: str) -> Optional[int]:
+        """Node number for a path, None if it is not in the tree"""
+        path = normalise_path(path)
+        position = bisect_left(self.sorted_paths, path)
+        if position < len(self.sorted_paths) and self.sorted_paths[position] == path:
+            return int(self.order[position])
+        return None
+
+    def describe(self, node: int) -> Dict[str, Any]:
+        """One node without its children"""
+        path = self.path(node)
+        name = path.rsplit("/", 1)[-1] if node else re.split(r"[\\/]", self.root_path.rstrip("\\/"))[-1]
+        info = {
+            "name": name,
+            "path": path,
+            "type": "directory" if self.is_dir[node] else "file",
+            "size": int(self.size[node]) if self.has_sizes else None
+        }
+        if self.is_dir[node]:
+            info["child_count"] = int(self.child_count[node])
+            info["file_count"] = int(self.file_count[node])
+            info["dir_count"] = int(self.dir_count[node])
+        return info
+
+    def expand(
+        self,
+        node: int,
+        depth: int = 1,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        max_nodes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """A node with `depth` levels of children; deeper levels are left out
+
+        `offset` pages the children of the requested node; `limit` caps the
+        children listed at every expanded level (`child_count` has the total).
+        `max_nodes` caps the nodes returned in all. Levels are filled
+        breadth-first, so the deepest ones are cut first; directories not
+        reached get no `children` and the result is marked `truncated`.
+        """
+        root = self.describe(node)
+        budget = None if max_nodes is None else max_nodes - 1
+        truncated = False
+        level = [(node, root, offset)]
+        for _ in range(depth):
+            below = []
+            for parent, info, skip in level:
+                if not self.is_dir[parent]:
+                    continue
+                if budget == 0 and self.child_count[parent] > skip:
+                    truncated = True
+                    break
+                first, count = int(self.first_child[parent]), int(self.child_count[parent])
+                start = first + skip
+                stop = first + count if limit is None else min(first + count, start + limit)
+                if budget is not None and stop - start > budget:
+                    stop, truncated = start + budget, True
+                children = list(range(start, stop))
+                info["children"] = [self.describe(child) for child in children]
+                below.extend((child, child_info, 0) for child, child_info in zip(children, info["children"]))
+                if budget is not None:
+                    budget -= len(children)
+            level = below
+        if truncated:
+            root["truncated"] = True
+        return root
+
+    def search(self, pattern: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Paths matching a prefix, or a glob if `pattern` has * ? or [
+
+        Only the sorted range sharing the pattern's literal prefix is
+        scanned; glob `*` also matches across '/'.
+        """
+        # Same normalisation as find(); a trailing '/' still limits a
+        # prefix to the directory's contents
+        within = pattern.strip().replace("\\", "/").endswith("/")
+        pattern = normalise_path(pattern)
+        if pattern == ".":
+            pattern = ""
+        elif within:
+            pattern += "/"
+        wildcard = _GLOB_CHARS.search(pattern)
+        prefix = pattern[:wildcard.start()] if wildcard else pattern
+        start = bisect_left(self.sorted_paths, prefix)
+        stop = bisect_left(self.sorted_paths, prefix + _PREFIX_END, lo=start)
+
+        candidates: Iterable[int] = range(start, stop)
+        if wildcard:
+            matcher = re.compile(translate(pattern)).match
+            candidates = (position for position in candidates if matcher(self.sorted_paths[position]))
+
+        results = []
+        for position in candidates:
+            if len(results) >= limit:
+                break
+            results.append(self.describe(int(self.order[position])))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        arrays = (self.parent, self.first_child, self.child_count, self.is_dir, self.size,
+                  self.file_count, self.dir_count, self.order, self.rank)
+        return {
+            "root_path": self.root_path,
+            "nodes": len(self),
+            "files": int(self.file_count[0]),
+            "directories": int(self.dir_count[0]) + 1,
+            "has_sizes": self.has_sizes,
+            "array_bytes": sum(array.nbytes for array in arrays)
+        }
@@ -0,0 +1,321 @@
+# services/vector_index.py
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SearchResult = List[Tuple[int, float]]
+
+
+def top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> SearchResult:
+    """Pick the k best (id, score) pairs, highest score first"""
+    if len(scores) == 0 or k <= 0:
+        return []
+    if len(scores) > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+class ExactIndex:
+    """Brute-force cosine similarity over float32 vectors
+
+    Rows live in buffers that grow by doubling, so a run of small adds
+    copies each vector O(1) times; `ids` and `vectors` are views of the
+    filled rows.
+    """
+
+    def __init__(self, dim: int, capacity: int = 0):
+        self.dim = dim
+        self.count = 0
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._vectors = np.empty((capacity, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.count]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self.count]
+
+    def reserve(self, extra: int):
+        """Grow the buffers (doubling) so `extra` more rows fit"""
+        needed = self.count + extra
+        if needed <= len(self._ids):
+            return
+        capacity = max(needed, len(self._ids) * 2)
+        ids = np.empty(capacity, dtype=np.int64)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        ids[:self.count] = self.ids
+        vectors[:self.count] = self.vectors
+        self._ids, self._vectors = ids, vectors
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Add unit-length vectors under the given integer ids"""
+        ids = np.asarray(ids, dtype=np.int64)
+        self.reserve(len(ids))
+        self._ids[self.count:self.count + len(ids)] = ids
+        self._vectors[self.count:self.count + len(ids)] = vectors
+        self.count += len(ids)
+
+    def remove(self, ids: np.ndarray) -> int:
+        """Remove vectors by id, returns how many were removed"""
+        keep = ~np.isin(self.ids, ids)
+        removed = self.count - int(keep.sum())
+        if removed:
+            # Compact in place; rows only move towards the front
+            kept = np.flatnonzero(keep)
+            self._ids[:len(kept)] = self._ids[kept]
+            self._vectors[:len(kept)] = self._vectors[kept]
+            self.count = len(kept)
+        return removed
+
+    def search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None, **params) -> SearchResult:
+        """Exact top-k by dot product; search params are ignored
+
+        `mask[ids]` yields a bool per id; only rows it allows are scored.
+        """
+        if mask is None:
+            return top_k(self.ids, self.vectors @ query, k)
+        rows = np.flatnonzero(mask[self.ids])
+        return top_k(self.ids[rows], self.vectors[rows] @ query, k)
+
+    def memory_bytes(self) -> int:
+        return self._ids.nbytes + self._vectors.nbytes
+
+
+class IVFIndex:
+    """Inverted-file ANN index with int8 scalar-quantized vectors.
+
+    Vectors are assigned to the nearest of `nlist` centroids trained with
+    spherical k-means, and stored as int8 codes (4x smaller than float32).
+    A query only scores the `nprobe` lists whose centroids are closest, so
+    `nprobe` trades recall for latency and can be set per query.
+
+    Until enough vectors have arrived to train the centroids, vectors are
+    kept in an exact float32 buffer and searched brute-force.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: int = 256,
+        nprobe: int = 8,
+        train_size: Optional[int] = None,
+        kmeans_iters: int = 20,
+        seed: int = 0
+    ):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        # Rule of thumb: ~40 points per centroid for stable k-means
+        self.train_size = train_size or nlist * 39
+        self.kmeans_iters = kmeans_iters
+        self._rng = np.random.default_rng(seed)
+
+        self._pending = ExactIndex(dim)
+        self.centroids: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.offset: Optional[np.ndarray] = None
+        self.list_ids: List[np.ndarray] = []
+        self.list_codes: List[np.ndarray] = []
+        # (centroids, scale, offset) fitted ahead of training by prepare()
+        self._fitted: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._pending) + sum(len(ids) for ids in self.list_ids)
+
+    # --- Training -------------------------------------------------------
+
+    def _fit(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Centroids and int8 quantizer for vectors; leaves the index untouched"""
+        if len(vectors) < self.nlist:
+            raise ValueError(f"Need at least {self.nlist} vectors to train, got {len(vectors)}")
+
+        sample = vectors
+        max_sample = self.nlist * 256
+        if len(sample) > max_sample:
+            sample = sample[self._rng.choice(len(sample), max_sample, replace=False)]
+
+        centroids = self._kmeans(sample)
+
+        # Affine int8 quantizer per dimension: x ~= code * scale + offset
+        lo = vectors.min(axis=0)
+        hi = vectors.max(axis=0)
+        scale = np.maximum((hi - lo) / 255.0, 1e-12).astype(np.float32)
+        offset = (lo + 128.0 * scale).astype(np.float32)
+        return centroids, scale, offset
+
+    def prepare(self, vectors: np.ndarray):
+        """Fit the quantizer ahead of an add() of `vectors` that will train.
+
+        Only reads the index, so callers can run the k-means pass while
+        searches continue and take their write lock just for add().
+        """
+        if self.is_trained or len(self._pending) + len(vectors) < self.train_size:
+            return
+        self._fitted = self._fit(np.vstack([self._pending.vectors, np.asarray(vectors, dtype=np.float32)]))
+
+    def train(self):
+        """Train centroids and quantizer on the buffered vectors"""
+        vectors, ids = self._pending.vectors, self._pending.ids
+        fitted, self._fitted = self._fitted, None
+        self.centroids, self.scale, self.offset = fitted or self._fit(vectors)
+
+        self.list_ids = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self.list_codes = [np.empty((0, self.dim), dtype=np.int8) for _ in range(self.nlist)]
+        self._pending = ExactIndex(self.dim)
+        self._add_trained(ids, vectors)
+
+        logger.info(f"🧭 IVF index trained: {self.nlist} lists over {len(ids)} vectors")
+
+    def _kmeans(self, data: np.ndarray) -> np.ndarray:
+        """Spherical k-means: centroids are kept unit length"""
+        centroids = data[self._rng.choice(len(data), self.nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            assign = self._assign(data, centroids)
+            counts = np.bincount(assign, minlength=self.nlist)
+
+            # Per-cluster sums via one sort + reduceat over contiguous runs
+            order = np.argsort(assign, kind="stable")
+            present = np.flatnonzero(counts)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+            sums = np.zeros_like(centroids)
+            sums[present] = np.add.reduceat(data[order], starts, axis=0)
+
+            # Re-seed empty clusters from random points
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                sums[empty] = data[self._rng.choice(len(data), len(empty), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        return centroids.astype(np.float32)
+
+    @staticmethod
+    def _assign(data: np.ndarray, centroids: np.ndarray, batch: int = 16384) -> np.ndarray:
+        assign = np.empty(len(data), dtype=np.int64)
+        for start in range(0, len(data), batch):
+            assign[start:start + batch] = np.argmax(data[start:start + batch] @ centroids.T, axis=1)
+        return assign
+
+    # --- Mutation -------------------------------------------------------
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, -128, 127).astype(np.int8)
+
+    def _add_trained(self, ids: np.ndarray, vectors: np.ndarray):
+        assign = self._assign(vectors, self.centroids)
+        codes = self._encode(vectors)
+        for lst in np.unique(assign):
+            members = assign == lst
+            self.list_ids[lst] = np.concatenate([self.list_ids[lst], ids[members]])
+            self.list_codes[lst] = np.vstack([self.list_codes[lst], codes[members]])
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Add unit-length vectors under the given integer ids"""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.is_trained:
+            self._add_trained(ids, vectors)
+            return
+
+        self._pending.add(ids, vectors)
+        if len(self._pending) >= self.train_size:
+            self.train()
+
+    def remove(self, ids: np.ndarray) -> int:
+        """Remove vectors by id, returns how many were removed"""
+        removed = self._pending.remove(ids)
+        for lst, list_ids in enumerate(self.list_ids):
+            keep = ~np.isin(list_ids, ids)
+            if not keep.all():
+                removed += len(list_ids) - int(keep.sum())
+                self.list_ids[lst] = list_ids[keep]
+                self.list_codes[lst] = self.list_codes[lst][keep]
+        return removed
+
+    # --- Search ---------------------------------------------------------
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
+        **params
+    ) -> SearchResult:
+        """Approximate top-k, scoring only the `nprobe` closest lists
+
+        With a `mask` (`mask[ids]` yields a bool per id) disallowed rows are
+        skipped before scoring, and probing continues past `nprobe` lists
+        until about k * nlist / nprobe allowed candidates were seen. When
+        fewer rows than that pass the filter every list is visited, so all
+        allowed rows are scored and selective filters keep recall.
+        """
+        if not self.is_trained:
+            return self._pending.search(query, k, mask=mask)
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query
+        if mask is None:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.argsort(-centroid_scores)
+            wanted = max(k, k * self.nlist // nprobe)
+
+        # Score int8 codes directly: q . (c * scale + offset)
+        q_scaled = (query * self.scale).astype(np.float32)
+        bias = float(query @ self.offset)
+
+        ids, scores = [], []
+        candidates = 0
+        for probed, lst in enumerate(probe):
+            if mask is not None and probed >= nprobe and candidates >= wanted:
+                break
+            list_ids, codes = self.list_ids[lst], self.list_codes[lst]
+            if mask is not None and len(list_ids):
+                allowed = mask[list_ids]
+                list_ids, codes = list_ids[allowed], codes[allowed]
+            if len(list_ids):
+                ids.append(list_ids)
+                scores.append(codes.astype(np.float32) @ q_scaled)
+                candidates += len(list_ids)
+
+        if not ids:
+            return []
+        return top_k(np.concatenate(ids), np.concatenate(scores) + bias, k)
+
+    def memory_bytes(self) -> int:
+        total = self._pending.memory_bytes()
+        total += sum(ids.nbytes for ids in self.list_ids)
+        total += sum(codes.nbytes for codes in self.list_codes)
+        if self.is_trained:
+            total += self.centroids.nbytes + self.scale.nbytes + self.offset.nbytes
+        return total
+
+
+def create_index(kind: str, dim: int, **options):
+    """Build a vector index by name ("exact", "ivf" or "sharded")"""
+    if kind == "exact":
+        return ExactIndex(dim)
+    if kind == "ivf":
+        return IVFIndex(dim, **options)
+    if kind == "sharded":
+        # Imported here: starts worker processes, only wanted when configured
+        from services.sharded_index import ShardedIndex
+        return ShardedIndex(dim, **options)
+    raise ValueError(f"Unknown vector index type: {kind}")
@@ -0,0 +1,83 @@
+# tests/test_dedup.py
+import numpy as np
+import pytest
+
+from services.dedup import NearDuplicateIndex
+
+
+def make_text(seed: int, words: int = 160) -> str:
+    rng = np.random.default_rng(seed)
+    return " ".join(f"term{number}" for number in rng.integers(0, 5000, words))
+
+
+def edit(text: str, changes: int, seed: int = 99) -> str:
+    words = text.split()
+    rng = np.random.default_rng(seed)
+    for position in rng.choice(len(words), changes, replace=False):
+        words[position] = "edited"
+    return " ".join(words)
+
+
+@pytest.fixture
+def index():
+    return NearDuplicateIndex(num_perm=128, bands=16, threshold=0.8)
+
+
+def add_texts(index, texts, first_id: int = 0):
+    signatures = index.signatures(texts)
+    keys = index.band_keys(signatures)
+    for offset, (signature, key) in enumerate(zip(signatures, keys)):
+        index.add(first_id + offset, signature, key)
+
+
+def best_match(index, text):
+    signature = index.signatures([text])[0]
+    return index.match(signature, index.band_keys(signature[None, :])[0])
+
+
+def test_signatures_ignore_case_and_whitespace(index):
+    text = make_text(0)
+    first, second = index.signatures([text, "  " + text.upper().replace(" ", "\n ")])
+    assert np.array_equal(first, second)
+
+
+def test_matches_exact_and_near_duplicates(index):
+    texts = [make_text(seed) for seed in range(20)]
+    add_texts(index, texts)
+    assert best_match(index, texts[7]) == 7
+    assert best_match(index, edit(texts[11], 2)) == 11
+
+
+def test_rejects_unrelated_and_heavily_edited_text(index):
+    texts = [make_text(seed) for seed in range(20)]
+    add_texts(index, texts)
+    assert best_match(index, make_text(1000)) is None
+    assert best_match(index, edit(texts[3], 60)) is None
+
+
+def test_removed_chunks_no_longer_match(index):
+    texts = [make_text(seed) for seed in range(5)]
+    add_texts(index, texts)
+    index.remove(2)
+    assert len(index) == 4
+    assert best_match(index, texts[2]) is None
+    # The row moved into the hole still resolves to its own chunk
+    assert best_match(index, texts[4]) == 4
+
+
+def test_matches_survive_merges_and_compaction(index):
+    # Enough chunks to fill the recent buffer several times over
+    count = 3 * NearDuplicateIndex.RECENT_LIMIT // index.bands
+    texts = [make_text(seed, words=40) for seed in range(count)]
+    add_texts(index, texts)
+    assert len(index._recent_keys) < NearDuplicateIndex.RECENT_LIMIT
+    # Two thirds removed: enough stale band entries to force a compaction
+    removed = [chunk_id for chunk_id in range(count) if chunk_id % 3]
+    for chunk_id in removed:
+        index.remove(chunk_id)
+
+    assert len(index) == count - len(removed)
+    assert best_match(index, texts[1]) is None
+    assert best_match(index, texts[count - 2]) is None
+    assert best_match(index, texts[300]) == 300
+    assert best_match(index, texts[count - 3]) == count - 3
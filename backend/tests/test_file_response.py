@@ -0,0 +1,51 @@
+# tests/test_file_response.py
+import pytest
+
+from utils.file_response import RangeFileResponse, parse_range
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=0-1,4-5", "items=0-1", "bytes=a-b", "bytes=-"])
+def test_whole_file_when_range_is_absent_or_ignored(header):
+    assert parse_range(header, 100) is None
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    (" bytes=5-5 ", (5, 5)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=100-200", "bytes=9-5", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 100)
+
+
+@pytest.mark.parametrize("header", ["bytes=0-", "bytes=0-0", "bytes=-1", "bytes=-0"])
+def test_empty_file_has_no_satisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 0)
+
+
+def test_empty_file_answers_416(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    response = RangeFileResponse(str(path), range_header="bytes=-5")
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
+    assert response.headers["content-length"] == "0"
+
+
+def test_partial_response_headers(tmp_path):
+    path = tmp_path / "digits.txt"
+    path.write_bytes(b"0123456789")
+    response = RangeFileResponse(str(path), range_header="bytes=-3")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 7-9/10"
+    assert response.headers["content-length"] == "3"
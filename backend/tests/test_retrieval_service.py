@@ -0,0 +1,78 @@
+# tests/test_retrieval_service.py
+from datetime import datetime
+
+import pytest
+
+from config import settings
+from models.schemas import DocumentFilter, DocumentInfo
+from services.retrieval_service import RetrievalService
+from services.vector_index import ExactIndex
+
+BASE = " ".join(f"word{number} token{number * 7 % 13}" for number in range(1500))
+QUERY = "word100 token9"
+# Three versions of one text: an original, an extended copy and a lightly edited copy
+VERSIONS = {"0": ("txt", BASE), "1": ("md", BASE + " tail"), "2": ("txt", BASE.replace("word5 ", "w5 "))}
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = RetrievalService(index=ExactIndex(settings.EMBEDDING_DIM), deduplicate=True)
+    for document_id, (kind, text) in VERSIONS.items():
+        path = tmp_path / f"{document_id}.{kind}"
+        path.write_text(text, encoding="utf-8")
+        info = DocumentInfo(
+            id=document_id,
+            filename=path.name,
+            size=len(text),
+            upload_time=datetime.now(),
+            status="processed",
+            type=kind
+        )
+        service.add_document(info, text, path)
+    yield service
+    service.close()
+
+
+def test_duplicates_collapse_into_one_source(service):
+    stats = service.stats()
+    assert stats["duplicate_chunks"] > 0
+    assert len(service.index) == stats["chunks"] - stats["duplicate_chunks"]
+
+    top = service.search(QUERY, top_k=3)[0]
+    assert top["id"] == "0"
+    assert {duplicate["id"] for duplicate in top["duplicates"]} == {"1", "2"}
+    assert top["snippet"] == BASE[top["start"]:top["end"]]
+
+
+def test_filters_attribute_the_source_to_an_allowed_copy(service):
+    top = service.search(QUERY, top_k=3, filters=DocumentFilter(types=["md"]))[0]
+    assert top["id"] == "1"
+    assert "duplicates" not in top
+
+
+def test_deleting_the_indexed_copy_promotes_a_duplicate(service):
+    indexed = len(service.index)
+    assert service.remove_document("0") > 0
+
+    # The other copies keep the text: same number of vectors, now owned by an heir
+    assert len(service.index) == indexed
+    assert len(service.dedup) == indexed
+    top = service.search(QUERY, top_k=3)[0]
+    assert top["id"] == "1"
+    assert [duplicate["id"] for duplicate in top["duplicates"]] == ["2"]
+
+    filtered = service.search(QUERY, top_k=3, filters=DocumentFilter(document_ids=["2"]))[0]
+    assert filtered["id"] == "2"
+    assert "duplicates" not in filtered
+    # Read from the heir's own file
+    assert filtered["snippet"] == VERSIONS["2"][1][filtered["start"]:filtered["end"]]
+    assert service.search(QUERY, filters=DocumentFilter(document_ids=["0"])) == []
+
+
+def test_deleting_every_copy_empties_the_index(service):
+    for document_id in ("1", "0", "2"):
+        service.remove_document(document_id)
+    assert len(service.index) == 0
+    assert len(service.dedup) == 0
+    assert service.stats()["duplicate_chunks"] == 0
+    assert service.search(QUERY) == []
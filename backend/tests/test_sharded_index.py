@@ -0,0 +1,82 @@
+# tests/test_sharded_index.py
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+
+from services.sharded_index import ShardedIndex
+from services.vector_index import ExactIndex
+
+DIM = 32
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((600, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.arange(len(vectors), dtype=np.int64), vectors
+
+
+@pytest.fixture
+def sharded():
+    # Small blocks so adds also exercise growing the shared memory
+    index = ShardedIndex(DIM, shards=3, initial_capacity=16)
+    yield index
+    index.close()
+
+
+def assert_same_hits(actual, expected):
+    assert [chunk_id for chunk_id, _ in actual] == [chunk_id for chunk_id, _ in expected]
+    np.testing.assert_allclose([score for _, score in actual], [score for _, score in expected], rtol=1e-5)
+
+
+def test_matches_exact_index_after_removal_and_rebalance(sharded, data):
+    ids, vectors = data
+    exact = ExactIndex(DIM)
+    sharded.add(ids, vectors)
+    exact.add(ids, vectors)
+
+    # Empty most of one shard so the others have to hand rows over
+    on_first = ids[sharded.shards[0].ids[:sharded.shards[0].count]]
+    doomed = np.concatenate([on_first[:150], ids[::7]])
+    assert sharded.remove(doomed) == len(np.unique(doomed))
+    exact.remove(doomed)
+
+    sizes = sharded.shard_sizes()
+    assert sum(sizes) == len(sharded) == len(exact)
+    assert max(sizes) - min(sizes) <= max(1, sharded.imbalance * sum(sizes) / len(sizes))
+    for query in vectors[:20]:
+        assert_same_hits(sharded.search(query, 10), exact.search(query, 10))
+
+
+def test_masked_search_matches_exact_index(sharded, data):
+    ids, vectors = data
+    exact = ExactIndex(DIM)
+    sharded.add(ids, vectors)
+    exact.add(ids, vectors)
+    mask = np.zeros(len(ids), dtype=bool)
+    mask[::5] = True
+
+    for query in vectors[:10]:
+        hits = sharded.search(query, 10, mask=mask)
+        assert all(mask[chunk_id] for chunk_id, _ in hits)
+        assert_same_hits(hits, exact.search(query, 10, mask=mask))
+
+
+def test_dead_worker_is_replaced(sharded, data):
+    ids, vectors = data
+    exact = ExactIndex(DIM)
+    sharded.add(ids, vectors)
+    exact.add(ids, vectors)
+
+    os.kill(sharded.shards[1].process.pid, signal.SIGKILL)
+    sharded.shards[1].process.join(5)
+    assert_same_hits(sharded.search(vectors[3], 5), exact.search(vectors[3], 5))
+    deadline = time.monotonic() + 5
+    while not sharded.shards[1].process.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert sharded.shards[1].process.is_alive()
+    assert_same_hits(sharded.search(vectors[4], 5), exact.search(vectors[4], 5))
@@ -0,0 +1,57 @@
+# tests/test_tree_index.py
+import pytest
+
+from services.tree_index import TreeIndex
+
+
+def count_nodes(node) -> int:
+    return 1 + sum(count_nodes(child) for child in node.get("children", []))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path in ["a/1.txt", "a/2.txt", "a/3.txt", "b/c/4.txt", "b/c/5.txt", "b/6.txt", "x.txt"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(path)
+    (tmp_path / "empty").mkdir()
+    return TreeIndex.from_directory(str(tmp_path))
+
+
+def test_unbounded_expand_returns_everything(tree):
+    result = tree.expand(0, depth=10)
+    assert count_nodes(result) == len(tree)
+    assert "truncated" not in result
+
+
+@pytest.mark.parametrize("max_nodes", [1, 3, 6, 9])
+def test_max_nodes_caps_and_marks_truncation(tree, max_nodes):
+    result = tree.expand(0, depth=10, max_nodes=max_nodes)
+    assert count_nodes(result) == max_nodes
+    assert result["truncated"] is True
+
+
+def test_exact_budget_is_not_truncated(tree):
+    result = tree.expand(0, depth=10, max_nodes=len(tree))
+    assert count_nodes(result) == len(tree)
+    assert "truncated" not in result
+
+
+def test_levels_fill_breadth_first(tree):
+    # Root plus its four children: the first level is complete, nothing below it
+    result = tree.expand(0, depth=10, max_nodes=5)
+    assert [child["name"] for child in result["children"]] == ["a", "b", "empty", "x.txt"]
+    assert all("children" not in child for child in result["children"])
+    assert result["truncated"] is True
+
+
+def test_empty_directory_at_the_budget_is_not_truncation(tree):
+    node = tree.find("empty")
+    result = tree.expand(node, depth=3, max_nodes=1)
+    assert result["child_count"] == 0
+    assert "truncated" not in result
+
+
+def test_offset_and_limit_page_the_children(tree):
+    result = tree.expand(tree.find("a"), depth=1, offset=1, limit=1)
+    assert [child["name"] for child in result["children"]] == ["2.txt"]
+    assert result["child_count"] == 3
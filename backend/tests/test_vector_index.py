@@ -0,0 +1,64 @@
+# tests/test_vector_index.py
+import numpy as np
+import pytest
+
+from services.vector_index import ExactIndex, IVFIndex
+
+DIM = 32
+
+
+@pytest.fixture(scope="module")
+def data():
+    # Clustered like real embeddings, so list choice matters
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((40, DIM))
+    vectors = centres[rng.integers(0, len(centres), 8000)] + 0.5 * rng.standard_normal((8000, DIM))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    return np.arange(len(vectors), dtype=np.int64), vectors
+
+
+@pytest.fixture(scope="module")
+def indexes(data):
+    ids, vectors = data
+    ivf = IVFIndex(DIM, nlist=32, nprobe=2, train_size=4000)
+    exact = ExactIndex(DIM)
+    ivf.add(ids, vectors)
+    exact.add(ids, vectors)
+    assert ivf.is_trained
+    return ivf, exact
+
+
+def recall(ivf, exact, queries, k, mask):
+    found = total = 0
+    for query in queries:
+        expected = {chunk_id for chunk_id, _ in exact.search(query, k, mask=mask)}
+        hits = ivf.search(query, k, mask=mask)
+        assert all(mask[chunk_id] for chunk_id, _ in hits)
+        found += len(expected & {chunk_id for chunk_id, _ in hits})
+        total += len(expected)
+    return found / total
+
+
+@pytest.mark.parametrize("share", [0.01, 0.1, 0.5])
+def test_masked_search_keeps_recall(data, indexes, share):
+    ids, vectors = data
+    ivf, exact = indexes
+    rng = np.random.default_rng(1)
+    mask = rng.random(len(ids)) < share
+    queries = vectors[rng.choice(len(ids), 50, replace=False)]
+    assert recall(ivf, exact, queries, 10, mask) >= 0.9
+
+
+def test_masked_search_returns_nothing_when_nothing_passes(data, indexes):
+    ids, vectors = data
+    ivf, _ = indexes
+    assert ivf.search(vectors[0], 10, mask=np.zeros(len(ids), dtype=bool)) == []
+
+
+def test_removed_vectors_are_not_returned(data):
+    ids, vectors = data
+    ivf = IVFIndex(DIM, nlist=16, train_size=2000)
+    ivf.add(ids[:3000], vectors[:3000])
+    assert ivf.remove(ids[:1000]) == 1000
+    assert len(ivf) == 2000
+    assert all(chunk_id >= 1000 for chunk_id, _ in ivf.search(vectors[5], 20))
@@ -0,0 +1,122 @@
+# utils/file_response.py
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+ZERO_COPY_EXTENSION = "http.response.zerocopysend"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=` range into an inclusive (start, end) pair.
+
+    Returns None when the whole file should be sent (no header, or a
+    multi-range request, which we answer with the full body as RFC 9110
+    allows). Raises ValueError when the range cannot be satisfied.
+    """
+    if not header or "," in header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if size == 0:
+        # No byte of an empty file can be addressed
+        raise ValueError("Range not satisfiable")
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """File response with HTTP Range support and zero-copy sending.
+
+    When the ASGI server advertises the `http.response.zerocopysend`
+    extension the body is handed over as a file descriptor (sendfile);
+    otherwise it is streamed in chunks without loading the file.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        range_header: Optional[str] = None,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None
+    ):
+        self.path = path
+        self.media_type = media_type or "application/octet-stream"
+        self.background = None
+        size = os.stat(path).st_size
+
+        headers = {"accept-ranges": "bytes"}
+        if filename:
+            headers["content-disposition"] = f"inline; filename*=utf-8''{quote(filename)}"
+
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            self.status_code = 416
+            self.offset, self.count = 0, 0
+            headers["content-range"] = f"bytes */{size}"
+        else:
+            if byte_range is None:
+                self.status_code = 200
+                self.offset, self.count = 0, size
+            else:
+                self.status_code = 206
+                self.offset = byte_range[0]
+                self.count = byte_range[1] - byte_range[0] + 1
+                headers["content-range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+
+        headers["content-length"] = str(self.count)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        if self.count == 0 or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if ZERO_COPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": ZERO_COPY_EXTENSION,
+                    "file": f.fileno(),
+                    "offset": self.offset,
+                    "count": self.count
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.offset)
+            remaining = self.count
+            while remaining:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                # File shrank underneath us; close the body cleanly
+                await send({"type": "http.response.body", "body": b""})
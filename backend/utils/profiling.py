@@ -0,0 +1,276 @@
+# utils/profiling.py
+"""
+Opt-in per-request profiling.
+
+`ProfilingMiddleware` is only installed when PROFILING_ENABLED is set, so
+normal deployments pay nothing. When installed, a request marked with
+`?profile=1` and carrying the secret in the `X-Profile-Token` header runs
+under cProfile or a sampling thread, and the result lands in a bounded
+`ProfileStore` served by routes/debug.py. The secret never goes in the
+URL, where access logs, proxies and browser history would keep it.
+
+Both profilers watch the event-loop thread, so coroutines the request
+awaits are covered, including work ChatService hands to other tasks such
+as shared single-flight computations. They also follow the request into
+worker threads started through utils.threads.to_thread (retrieval,
+embedding, index training, dedup, PDF/DOCX extraction): the sampler
+samples those threads as well, and cProfile runs a profiler in each and
+merges the results. Other requests running on the loop at the same time
+show up too; profile on a quiet instance for clean data.
+"""
+import cProfile
+import hmac
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from utils.threads import current_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY_PARAM = "profile"
+# Query values that mark a request for profiling; the secret is only read from the header
+PROFILE_FLAG_VALUES = {"1", "true", "yes"}
+
+
+class CProfileSession:
+    """Deterministic profile of the event-loop thread and followed workers"""
+
+    kind = "cprofile"
+
+    def __init__(self):
+        self._profiler = cProfile.Profile()
+        self._workers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def start(self):
+        self._profiler.enable()
+
+    @contextmanager
+    def follow_thread(self) -> Iterator[None]:
+        """Profile the calling worker thread for the duration of the block"""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler owns the interpreter-wide hook (Python 3.12+)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._lock:
+                if not self._stopped:
+                    self._workers.append(profiler)
+
+    def stop(self) -> Dict[str, Any]:
+        self._profiler.disable()
+        with self._lock:
+            self._stopped = True
+            workers = list(self._workers)
+        stats = pstats.Stats(self._profiler)
+        for profiler in workers:
+            stats.add(profiler)
+        # Same bytes pstats.Stats.dump_stats() writes, loadable by snakeviz etc.
+        return {"pstats": marshal.dumps(stats.stats)}
+
+
+class SamplingSession:
+    """Low-overhead stack sampling from a helper thread.
+
+    Samples the event-loop thread plus any worker threads currently running
+    work for the request (see `follow_thread`).
+    """
+
+    kind = "sampling"
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._target = threading.get_ident()
+        # Worker thread id -> number of followed calls running on it
+        self._workers: Counter = Counter()
+        self._workers_lock = threading.Lock()
+        self._stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    @contextmanager
+    def follow_thread(self) -> Iterator[None]:
+        """Sample the calling worker thread for the duration of the block"""
+        ident = threading.get_ident()
+        with self._workers_lock:
+            self._workers[ident] += 1
+        try:
+            yield
+        finally:
+            with self._workers_lock:
+                self._workers[ident] -= 1
+                if not self._workers[ident]:
+                    del self._workers[ident]
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            with self._workers_lock:
+                idents = [self._target, *self._workers]
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Dict[str, Any]:
+        self._stopped.set()
+        self._thread.join()
+        return {"collapsed": dict(self._stacks)}
+
+
+class ProfileStore:
+    """Ring buffer of the most recent request profiles"""
+
+    def __init__(self, capacity: int = 20):
+        self.capacity = capacity
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, profile: Dict[str, Any]):
+        self._profiles[profile["id"]] = profile
+        while len(self._profiles) > self.capacity:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Profile summaries, newest first"""
+        summary_keys = ("id", "method", "path", "profiler", "started", "duration_ms", "status_code")
+        return [
+            {key: profile.get(key) for key in summary_keys}
+            for profile in reversed(self._profiles.values())
+        ]
+
+
+class _StoredStats:
+    """Minimal profiler stand-in that pstats.Stats can load from"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def render_text(profile: Dict[str, Any], limit: int = 60) -> str:
+    """Human-readable pstats table sorted by cumulative time"""
+    out = io.StringIO()
+    stats = pstats.Stats(_StoredStats(marshal.loads(profile["pstats"])), stream=out)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def render_collapsed(profile: Dict[str, Any]) -> str:
+    """Collapsed stacks, one `frame;frame;frame count` line each"""
+    stacks = profile["collapsed"]
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests carrying the profile token"""
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        token: str,
+        mode: str = "cprofile",
+        interval: float = 0.005,
+        skip_prefixes: Tuple[str, ...] = ()
+    ):
+        self.app = app
+        self.store = store
+        self.token = token
+        self.mode = mode
+        self.interval = interval
+        # Paths never profiled, e.g. the profile download routes: their
+        # profiles would evict the ones being fetched
+        self.skip_prefixes = skip_prefixes
+        # cProfile and the sampler both watch the loop thread: one at a time
+        self._busy = threading.Lock()
+
+    def _requested(self, scope) -> bool:
+        """`?profile=1` marks the request; the header must carry the secret"""
+        if not self.token:
+            return False
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if not any(value.lower() in PROFILE_FLAG_VALUES for value in query.get(PROFILE_QUERY_PARAM, [])):
+            return False
+        # Compared as bytes: compare_digest rejects non-ASCII str
+        token = self.token.encode("utf-8")
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes) or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._busy.acquire(blocking=False):
+            logger.warning(f"⚠️ Profiler busy, serving unprofiled: {scope['path']}")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        status = {}
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        session = SamplingSession(self.interval) if self.mode == "sampling" else CProfileSession()
+        started = time.time()
+        began = time.perf_counter()
+        session.start()
+        # Lets utils.threads.to_thread bring worker threads into this profile
+        context_token = current_profile.set(session)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            current_profile.reset(context_token)
+            data = session.stop()
+            self._busy.release()
+            self.store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "profiler": session.kind,
+                "started": started,
+                "duration_ms": round((time.perf_counter() - began) * 1000, 3),
+                "status_code": status.get("code"),
+                **data
+            })
+            logger.info(f"🔬 Profiled {scope['method']} {scope['path']} as {profile_id}")
@@ -0,0 +1,65 @@
+# utils/single_flight.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight computation.
+
+    The first caller for a key starts the computation as a task; every caller
+    that arrives while it is running awaits the same future instead of
+    starting its own. Callers are shielded, so one cancelled request does not
+    cancel the work other requests are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() for key, or join the computation already running for it"""
+        self.calls += 1
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            logger.debug(f"🔗 Coalesced request onto in-flight key: {key!r}")
+        else:
+            self.executions += 1
+            future = asyncio.ensure_future(self._run(key, fn))
+            self._inflight[key] = future
+            self._waiters[key] = 0
+
+        return await asyncio.shield(future)
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        try:
+            return await fn()
+        finally:
+            elapsed = time.perf_counter() - started
+            # Every follower that joined got this computation for free
+            self.saved_seconds += elapsed * self._waiters.pop(key, 0)
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters since startup"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            "saved_compute_seconds": round(self.saved_seconds, 6),
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,62 @@
+# utils/startup_profile.py
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+COLD_START_TARGET_SECONDS = 1.0
+
+
+def _import_times(module: str) -> List[Tuple[str, int, int]]:
+    """Import `module` in a fresh interpreter under -X importtime.
+
+    Returns (module, self_us, cumulative_us) for every module imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_startup(module: str = "main", top: int = 25):
+    """Print a per-module import-time and per-service init-time breakdown"""
+    rows = _import_times(module)
+    import_seconds = next((cum for name, _, cum in rows if name == module), 0) / 1e6
+
+    print(f"\n--- Import time: {module} (fresh interpreter) ---")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}")
+
+    # Service construction, in this process, the way the lifespan does it
+    from services import providers
+
+    started = time.perf_counter()
+    providers.warm_up()
+    init_seconds = time.perf_counter() - started
+    asyncio.run(providers.shutdown())
+
+    print("\n--- Service init time (includes dependencies it builds) ---")
+    for name, seconds in providers.init_times().items():
+        print(f"{seconds * 1000:>14.1f}  {name}")
+
+    total = import_seconds + init_seconds
+    status = "✅" if total < COLD_START_TARGET_SECONDS else "⚠️"
+    print(f"\n{status} Cold start: {total * 1000:.1f} ms "
+          f"(import {import_seconds * 1000:.1f} ms + init {init_seconds * 1000:.1f} ms, "
+          f"target {COLD_START_TARGET_SECONDS * 1000:.0f} ms)\n")
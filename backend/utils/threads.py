@@ -0,0 +1,22 @@
+# utils/threads.py
+import asyncio
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Profile session of the current request, set by ProfilingMiddleware.
+# asyncio.to_thread copies the context, so the worker thread sees it too.
+current_profile: ContextVar[Optional[Any]] = ContextVar("current_profile", default=None)
+
+
+async def to_thread(func: Callable[..., T], *args, **kwargs) -> T:
+    """asyncio.to_thread that a profiled request's profiler follows into the worker"""
+    return await asyncio.to_thread(_run_followed, func, *args, **kwargs)
+
+
+def _run_followed(func: Callable[..., T], *args, **kwargs) -> T:
+    session = current_profile.get()
+    with session.follow_thread() if session is not None else nullcontext():
+        return func(*args, **kwargs)
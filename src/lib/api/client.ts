@@ -51,13 +51,22 @@ export const apiClient = new APIClient(API_BASE_URL)
 export { API_BASE_URL }
 
 // Chat API
+// Giới hạn tìm kiếm theo loại file, ngày upload hoặc danh sách tài liệu
+export interface ChatFilters {
+  types?: string[]
+  uploaded_after?: string
+  uploaded_before?: string
+  document_ids?: string[]
+}
+
 export const chatAPI = {
-  sendMessage: async (message: string, conversationId?: string) => {
+  sendMessage: async (message: string, conversationId?: string, filters?: ChatFilters) => {
     return apiClient.request<any>('/api/v1/chat', {
       method: 'POST',
       body: JSON.stringify({ 
         message, 
-        conversation_id: conversationId 
+        conversation_id: conversationId,
+        filters
       })
     })
   },
@@ -88,4 +97,17 @@ export const documentsAPI = {
       method: 'DELETE' 
     })
   },
+}
+
+// Directory tree API - mở rộng từng cấp, không tải cả cây
+export const treeAPI = {
+  get: async (path: string = '.', depth: number = 1) => {
+    const params = new URLSearchParams({ path, depth: String(depth) })
+    return apiClient.request<any>(`/api/v1/tree?${params}`)
+  },
+  
+  search: async (q: string, limit: number = 100) => {
+    const params = new URLSearchParams({ q, limit: String(limit) })
+    return apiClient.request<any>(`/api/v1/tree/search?${params}`)
+  },
 }
\ No newline at end of file